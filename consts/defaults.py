@@ -0,0 +1,10 @@
+"""
+Fallback values used when neither the day's schedule nor the household defaults set them.
+"""
+
+# Minutes since midnight
+DEFAULT_START_MIN = 7 * 60 + 50  # 07:50
+DEFAULT_END_MIN = 8 * 60 + 10    # 08:10
+
+# settings.key holding the household default profile (JSON)
+SCHEDULE_DEFAULTS_KEY = "schedule_defaults"
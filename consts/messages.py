@@ -8,6 +8,7 @@ ERROR_MESSAGES = {
     "ERR_002": "持ち物を1つ以上選んでね。",
     "ERR_003": "メッセージが長すぎるよ（50文字以内）。",
     "ERR_004": "帰宅時の応援メッセージも入れてね！",
+    "ERR_005": "ほかの人が先にこの日を更新しました。最新の内容を読み込んでから、もう一度保存してね。",
     "ERR_SYS_01": "保存に失敗しました。",
 
     # Child / Main View Errors
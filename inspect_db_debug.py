@@ -12,7 +12,7 @@ cursor = conn.cursor()
 
 print("--- history (Last 10) ---")
 try:
-    cursor.execute('SELECT * FROM history ORDER BY date DESC LIMIT 10')
+    cursor.execute('SELECT * FROM history_text ORDER BY date DESC LIMIT 10')
     for row in cursor.fetchall():
         print(dict(row))
 except Exception as e:
@@ -20,7 +20,7 @@ except Exception as e:
 
 print("\n--- daily_schedules (Last 10) ---")
 try:
-    cursor.execute('SELECT * FROM daily_schedules ORDER BY date DESC LIMIT 10')
+    cursor.execute('SELECT * FROM daily_schedules_text ORDER BY date DESC LIMIT 10')
     for row in cursor.fetchall():
         print(dict(row))
 except Exception as e:
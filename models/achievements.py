@@ -0,0 +1,42 @@
+"""
+Rule tables for points and badges.
+
+Rules are evaluated once per departure against a small context dict, so
+adding a new reward is a one-line change here rather than a new query.
+"""
+
+# Points awarded per departure. ctx keys: on_time, streak, month_complete
+POINT_RULES = [
+    {"key": "departure", "label": "出発できた", "points": 10, "when": lambda ctx: True},
+    {"key": "on_time", "label": "時間どおり", "points": 5, "when": lambda ctx: ctx["on_time"]},
+    {"key": "streak", "label": "れんぞくボーナス", "points": 5, "when": lambda ctx: ctx["streak"] >= 5},
+    {"key": "full_month", "label": "1か月ぜんぶ出発", "points": 50, "when": lambda ctx: ctx["month_complete"]},
+]
+
+# Badges are awarded once. summary keys: total_points, current_streak, best_streak; ctx as above
+BADGE_RULES = [
+    {"key": "first_departure", "label": "🎒 はじめての出発", "when": lambda s, ctx: True},
+    {"key": "streak_5", "label": "🔥 5日れんぞく", "when": lambda s, ctx: s["current_streak"] >= 5},
+    {"key": "streak_10", "label": "🔥 10日れんぞく", "when": lambda s, ctx: s["current_streak"] >= 10},
+    {"key": "streak_20", "label": "🌟 20日れんぞく", "when": lambda s, ctx: s["current_streak"] >= 20},
+    {"key": "points_100", "label": "💯 100ポイント", "when": lambda s, ctx: s["total_points"] >= 100},
+    {"key": "points_1000", "label": "👑 1000ポイント", "when": lambda s, ctx: s["total_points"] >= 1000},
+    # Full-month badges are per month, so the key carries the month
+    {"key": "full_month_{month}", "label": "💮 {month} ぜんぶ出発", "when": lambda s, ctx: ctx["month_complete"]},
+]
+
+
+def score_departure(ctx):
+    """Returns (points, [rule keys that fired])."""
+    fired = [rule for rule in POINT_RULES if rule["when"](ctx)]
+    return sum(rule["points"] for rule in fired), [rule["key"] for rule in fired]
+
+
+def new_badges(summary, ctx, owned_keys):
+    """Badges earned by this departure that the child does not have yet."""
+    earned = []
+    for rule in BADGE_RULES:
+        key = rule["key"].format(month=ctx["month"])
+        if key not in owned_keys and rule["when"](summary, ctx):
+            earned.append({"key": key, "label": rule["label"].format(month=ctx["month"]), "date": ctx["date"]})
+    return earned
@@ -0,0 +1,57 @@
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+CheckKey = Tuple[int, int]  # (child_id, day number)
+
+
+class DebouncedCheckWriter:
+    """
+    Coalesces rapid checklist taps into one write per (child, date).
+
+    Each set() replaces the pending tick set and restarts a short timer; only the
+    last state is written when the taps stop. flush() writes immediately (used
+    right before departure so the counters see the final ticks).
+    """
+
+    def __init__(self, write_fn: Callable[[int, int, frozenset], None], delay: float = 1.5):
+        self._write_fn = write_fn
+        self._delay = delay
+        self._pending: Dict[CheckKey, frozenset] = {}
+        self._timers: Dict[CheckKey, threading.Timer] = {}
+        self._lock = threading.Lock()
+
+    def set(self, child_id: int, day: int, checked_ids):
+        key = (child_id, day)
+        with self._lock:
+            self._pending[key] = frozenset(checked_ids)
+            timer = self._timers.pop(key, None)
+            if timer:
+                timer.cancel()
+            timer = threading.Timer(self._delay, self._flush_key, (key,))
+            timer.daemon = True
+            self._timers[key] = timer
+            timer.start()
+
+    def pending(self, child_id: int, day: int) -> Optional[frozenset]:
+        with self._lock:
+            return self._pending.get((child_id, day))
+
+    def flush(self, child_id: Optional[int] = None, day: Optional[int] = None):
+        """Writes pending state now (everything, or just one key)."""
+        with self._lock:
+            keys = [(child_id, day)] if child_id is not None else list(self._pending)
+        for key in keys:
+            self._flush_key(key)
+
+    def _flush_key(self, key: CheckKey):
+        with self._lock:
+            checked = self._pending.pop(key, None)
+            timer = self._timers.pop(key, None)
+        if timer:
+            timer.cancel()
+        if checked is None:
+            return
+        try:
+            self._write_fn(key[0], key[1], checked)
+        except Exception as e:
+            print(f"[ERROR] DebouncedCheckWriter: {e}")
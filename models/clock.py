@@ -0,0 +1,81 @@
+from datetime import datetime, date, timedelta
+import threading
+
+
+class SystemClock:
+    """Wall clock used in production."""
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def today(self) -> date:
+        return date.today()
+
+
+class SimulatedClock:
+    """
+    Manually driven clock for simulations and tests.
+    Time only moves when set() / advance() is called.
+    """
+
+    def __init__(self, start: datetime):
+        self._now = start
+
+    def now(self) -> datetime:
+        return self._now
+
+    def today(self) -> date:
+        return self._now.date()
+
+    def set(self, dt: datetime):
+        self._now = dt
+
+    def advance(self, **kwargs):
+        """Moves the clock forward, e.g. advance(hours=4) or advance(days=1)."""
+        self._now += timedelta(**kwargs)
+
+
+class DayEpoch:
+    """
+    Process-wide day counter shared by every session.
+
+    One timer per process fires at local midnight and bumps the epoch, so sessions
+    only compare numbers instead of each polling the clock. current() also catches
+    up when the clock moved without the timer (simulated clocks, a late timer).
+    """
+
+    def __init__(self, clock):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._day = clock.today()
+        self._epoch = 0
+        self._timer = None
+
+    def current(self) -> int:
+        today = self.clock.today()
+        with self._lock:
+            if today != self._day:
+                self._day = today
+                self._epoch += 1
+            return self._epoch
+
+    def seconds_until_rollover(self) -> float:
+        now = self.clock.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        return (midnight - now).total_seconds()
+
+    def start(self):
+        """Arms the midnight timer (real clocks only)."""
+        with self._lock:
+            if self._timer is not None:
+                return
+            # A second of slack so the clock is surely on the new day when it fires
+            self._timer = threading.Timer(self.seconds_until_rollover() + 1, self._fire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _fire(self):
+        with self._lock:
+            self._timer = None
+        self.current()
+        self.start()
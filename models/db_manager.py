@@ -1,5 +1,242 @@
 import sqlite3
 import os
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date, time
+
+SCHEMA_VERSION = 7
+DEFAULT_CHILD_ID = 1
+PLAN_CACHE_SIZE = 256
+PLAN_FIELDS = ("item_ids", "departure_message", "return_message", "is_time_restricted", "start_min", "end_min")
+
+# v3 からは型つきで保存するっぴ：
+#   日付 → 1970-01-01 からの日数 (day)、時刻 → 0時からの分 (*_min)、出発時刻 → 0時からの秒、
+#   フラグ → 0/1（NULL は「共通ルールを引き継ぐ」）、status → コード
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+STATUS_SUCCESS = 1
+STATUS_NAMES = {STATUS_SUCCESS: "success"}
+
+
+def day_number(d):
+    return d.toordinal() - EPOCH_ORDINAL
+
+
+def day_date(day):
+    return date.fromordinal(day + EPOCH_ORDINAL)
+
+
+def minute_of_day(t):
+    return t.hour * 60 + t.minute
+
+
+def time_of_minute(minutes):
+    return time(minutes // 60, minutes % 60)
+
+
+def _legacy_day(text):
+    """"YYYY-MM-DD"（"YYYY/MM/DD"・一桁の月日・時刻つきも）を日数に。読めなければ ValueError。移行のときだけ使うっぴ。"""
+    if not text:
+        return None
+    head = str(text).strip().replace("/", "-").replace("T", " ").split(" ")[0]
+    try:
+        year, month, day = (int(part) for part in head.split("-"))
+        return day_number(date(year, month, day))
+    except ValueError:
+        raise ValueError(f"migration: unreadable legacy date {text!r}") from None
+
+
+def _legacy_seconds(text):
+    """"HH:MM" / "HH:MM:SS" を0時からの秒に（読めなければ None）。"""
+    try:
+        parts = [int(p) for p in (text or "").split(":")]
+    except ValueError:
+        return None
+    if len(parts) not in (2, 3):
+        return None
+    return parts[0] * 3600 + parts[1] * 60 + (parts[2] if len(parts) == 3 else 0)
+
+
+def _legacy_minutes(text):
+    """"HH:MM" / "HH:MM:SS" / "" を分に（読めなければ None）。移行のときだけ使うっぴ。"""
+    try:
+        hour, minute = (text or "").split(":")[:2]
+        return int(hour) * 60 + int(minute)
+    except ValueError:
+        return None
+
+
+def _legacy_flag(text):
+    return {"true": 1, "false": 0}.get(str(text).lower())
+
+TABLE_DDL = {
+    # 1. アイテム（UNIQUE(name)）… 兄弟で共通のカタログ
+    "items": """
+        CREATE TABLE IF NOT EXISTS items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            icon TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+    """,
+    # 1.5 こどもプロフィール
+    "children": """
+        CREATE TABLE IF NOT EXISTS children (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            icon TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+    """,
+    # 2. スケジュールの中身（内容ハッシュで1回だけ保存、何日からでも共有）
+    "schedule_plans": """
+        CREATE TABLE IF NOT EXISTS schedule_plans (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            hash TEXT NOT NULL UNIQUE,
+            item_ids TEXT,
+            departure_message TEXT,
+            return_message TEXT,
+            is_time_restricted INTEGER,
+            start_min INTEGER,
+            end_min INTEGER
+        );
+    """,
+    # 2.5 スケジュール（UNIQUE(child_id, day)、中身は plan_id で参照）
+    "daily_schedules": """
+        CREATE TABLE IF NOT EXISTS daily_schedules (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            child_id INTEGER NOT NULL DEFAULT 1,
+            day INTEGER NOT NULL,
+            plan_id INTEGER NOT NULL,
+            version INTEGER NOT NULL DEFAULT 0,
+            UNIQUE(child_id, day)
+        );
+    """,
+    # 3. 設定
+    "settings": """
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+    """,
+    # 3.5 繰り返しルール（曜日ビットマスク＋期間＋除外日）
+    "schedule_rules": """
+        CREATE TABLE IF NOT EXISTS schedule_rules (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            child_id INTEGER NOT NULL DEFAULT 1,
+            weekday_mask INTEGER NOT NULL,
+            start_day INTEGER NOT NULL,
+            end_day INTEGER,
+            exceptions TEXT,
+            item_ids TEXT,
+            departure_message TEXT,
+            return_message TEXT,
+            is_time_restricted INTEGER,
+            start_min INTEGER,
+            end_min INTEGER
+        );
+    """,
+    # 4. 履歴（UNIQUE(child_id, day) ＆ 132行版の構造を完全復元）
+    "history": """
+        CREATE TABLE IF NOT EXISTS history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            child_id INTEGER NOT NULL DEFAULT 1,
+            day INTEGER NOT NULL,
+            status INTEGER NOT NULL,
+            departure_sec INTEGER,
+            points INTEGER DEFAULT 0,
+            badges_awarded TEXT,
+            prev_best_streak INTEGER,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(child_id, day)
+        );
+    """,
+    # 5. 曜日ごとの出発時刻の統計（record_departure で O(1) 更新）
+    "departure_stats": """
+        CREATE TABLE IF NOT EXISTS departure_stats (
+            child_id INTEGER NOT NULL,
+            weekday INTEGER NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            ewma_minutes REAL,
+            sketch TEXT,
+            last_day INTEGER,
+            PRIMARY KEY (child_id, weekday)
+        );
+    """,
+    # 6. ポイント・バッジの集計（AchievementView は1行読むだけ）
+    "achievement_summary": """
+        CREATE TABLE IF NOT EXISTS achievement_summary (
+            child_id INTEGER PRIMARY KEY,
+            total_points INTEGER NOT NULL DEFAULT 0,
+            current_streak INTEGER NOT NULL DEFAULT 0,
+            best_streak INTEGER NOT NULL DEFAULT 0,
+            last_departure_day INTEGER,
+            month_key TEXT,
+            month_departures INTEGER NOT NULL DEFAULT 0,
+            badges TEXT NOT NULL DEFAULT '[]'
+        );
+    """,
+    # 7. 持ち物チェック（1日1行、チェック済みIDのCSV）
+    "item_checks": """
+        CREATE TABLE IF NOT EXISTS item_checks (
+            child_id INTEGER NOT NULL,
+            day INTEGER NOT NULL,
+            checked_ids TEXT NOT NULL DEFAULT '',
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (child_id, day)
+        );
+    """,
+    # 8. 持ち物ごとの忘れ物カウンタ（出発時に加算）
+    "item_stats": """
+        CREATE TABLE IF NOT EXISTS item_stats (
+            child_id INTEGER NOT NULL,
+            item_id INTEGER NOT NULL,
+            scheduled_count INTEGER NOT NULL DEFAULT 0,
+            ticked_count INTEGER NOT NULL DEFAULT 0,
+            forgotten_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (child_id, item_id)
+        );
+    """,
+}
+
+# UNIQUE(child_id, day) が (child_id, day) の複合インデックスを兼ねるっぴ
+INDEX_DDL = [
+    "CREATE INDEX IF NOT EXISTS idx_history_date ON history (day, child_id);",
+    "CREATE INDEX IF NOT EXISTS idx_schedule_rules_child ON schedule_rules (child_id, start_day);",
+    # どの日からも指されなくなったプランを探すのに使うっぴ
+    "CREATE INDEX IF NOT EXISTS idx_daily_schedules_plan ON daily_schedules (plan_id);",
+]
+
+# 昔の文字列の形で読みたい人（inspect_db_debug.py など）向けの互換ビューだっぴ
+VIEW_DDL = [
+    """
+    CREATE VIEW IF NOT EXISTS history_text AS
+    SELECT id, child_id, date(day * 86400, 'unixepoch') AS date,
+           CASE status WHEN 1 THEN 'success' ELSE '' END AS status,
+           CASE WHEN departure_sec IS NULL THEN NULL
+                ELSE printf('%02d:%02d:%02d', departure_sec / 3600, departure_sec / 60 % 60, departure_sec % 60)
+           END AS departure_time,
+           points, created_at
+    FROM history;
+    """,
+    """
+    CREATE VIEW IF NOT EXISTS daily_schedules_text AS
+    SELECT s.id, s.child_id, date(s.day * 86400, 'unixepoch') AS date,
+           p.item_ids, p.departure_message, p.return_message,
+           CASE p.is_time_restricted WHEN 1 THEN 'true' WHEN 0 THEN 'false' ELSE '' END AS is_time_restricted,
+           CASE WHEN p.start_min IS NULL THEN '' ELSE printf('%02d:%02d', p.start_min / 60, p.start_min % 60) END AS start_time,
+           CASE WHEN p.end_min IS NULL THEN '' ELSE printf('%02d:%02d', p.end_min / 60, p.end_min % 60) END AS end_time
+    FROM daily_schedules s JOIN schedule_plans p ON p.id = s.plan_id;
+    """,
+    """
+    CREATE VIEW IF NOT EXISTS item_checks_text AS
+    SELECT child_id, date(day * 86400, 'unixepoch') AS date, checked_ids, updated_at
+    FROM item_checks;
+    """,
+]
 
 class DatabaseManager:
     """
@@ -11,6 +248,9 @@ class DatabaseManager:
     
     def __init__(self, db_path: str = "wasuremono.db"):
         self.db_path = db_path
+        # プランは中身が変わらないので、id→中身 を小さなLRUで覚えておけるっぴ
+        self._plan_cache = OrderedDict()
+        self._plan_lock = threading.Lock()
         self.initialize_db()
 
     def get_connection(self):
@@ -20,60 +260,35 @@ class DatabaseManager:
         conn.row_factory = sqlite3.Row  
         return conn
 
+    @contextmanager
+    def transaction(self):
+        """複数の書き込みを1コミットにまとめるっぴ。例外時はロールバック。"""
+        conn = self.get_connection()
+        try:
+            yield conn.cursor()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
     def initialize_db(self):
         """DDLを完全再現。UNIQUE制約で物理的にバグを殺すっぴ。"""
-        ddl_statements = [
-            # 1. アイテム（UNIQUE(name)）
-            """
-            CREATE TABLE IF NOT EXISTS items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL UNIQUE,
-                icon TEXT,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            );
-            """,
-            # 2. スケジュール（UNIQUE(date)）
-            """
-            CREATE TABLE IF NOT EXISTS daily_schedules (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL UNIQUE,                
-                item_ids TEXT,                     
-                departure_message TEXT,
-                return_message TEXT,
-                is_time_restricted TEXT DEFAULT 'false',
-                start_time TEXT DEFAULT '07:50',
-                end_time TEXT DEFAULT '08:10'
-            );
-            """,
-            # 3. 設定
-            """
-            CREATE TABLE IF NOT EXISTS settings (
-                key TEXT PRIMARY KEY,
-                value TEXT NOT NULL,
-                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            );
-            """,
-            # 4. 履歴（UNIQUE(date) ＆ 132行版の構造を完全復元）
-            """
-            CREATE TABLE IF NOT EXISTS history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL UNIQUE,
-                status TEXT NOT NULL,
-                departure_time TEXT,
-                points INTEGER DEFAULT 0,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            );
-            """
-        ]
-
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                for ddl in ddl_statements:
+                for ddl in TABLE_DDL.values():
+                    cursor.execute(ddl)
+
+                # 古いDBの形をそろえてからインデックスを張るっぴ
+                self._migrate(cursor)
+                for ddl in INDEX_DDL + VIEW_DDL:
                     cursor.execute(ddl)
                 
                 # 初期シード設定
                 cursor.execute("INSERT OR IGNORE INTO settings (key, value) VALUES ('app_version', '5.5')")
+                cursor.execute("INSERT OR IGNORE INTO children (id, name, icon) VALUES (?, ?, ?)", (DEFAULT_CHILD_ID, "こども", "🧒"))
                 
                 # デフォルトアイテムの復元（日本語エンコード対策）
                 items = [('ランドセル', '🎒'), ('ぼうし', '🧢'), ('すいとう', '🍶'), ('給食袋', '🍱'), ('リコーダー', '🎵')]
@@ -83,6 +298,231 @@ class DatabaseManager:
         except sqlite3.Error as e:
             print(f"Error initializing database: {e}")
 
+    def _migrate(self, cursor):
+        """
+        PRAGMA user_version で段階的にスキーマを上げるっぴ。各ステップは何度走っても安全。
+        全部を1つのトランザクションでやるので、途中で失敗したら古い形と中身のまま残る（次の起動でやり直せる）。
+        """
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        cursor.execute("BEGIN")
+        try:
+            self._migrate_steps(cursor, version)
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            cursor.execute("COMMIT")
+        except Exception:
+            if cursor.connection.in_transaction:
+                cursor.execute("ROLLBACK")
+            raise
+
+    def _migrate_steps(self, cursor, version):
+        if version < 1:
+            self._migrate_v1_child_profiles(cursor)
+        if version < 2:
+            self._migrate_v2_schedule_plans(cursor)
+        if version < 3:
+            self._migrate_v3_typed_columns(cursor)
+        if version < 4:
+            self._migrate_v4_schedule_versions(cursor)
+        if version < 5:
+            self._migrate_v5_history_awards(cursor)
+        if version < 6:
+            self._migrate_v6_stats_last_day(cursor)
+        if version < 7:
+            self._migrate_v7_drop_orphan_plans(cursor)
+
+    @staticmethod
+    def _columns(cursor, table):
+        return [row[1] for row in cursor.execute(f"PRAGMA table_info({table})").fetchall()]
+
+    @staticmethod
+    def _read_rows(cursor, table):
+        return [dict(row) for row in cursor.execute(f"SELECT * FROM {table}").fetchall()]
+
+    def _rebuild_table(self, cursor, table, columns, rows):
+        """
+        SQLiteはUNIQUE制約を変えられないので、作り直して中身を入れ直すっぴ。
+        rows は変換済みの値（columns の順）。変換は呼ぶ前に全部すませておき、読めない行があれば何も消さずに止まる。
+        """
+        cursor.execute(f"DROP TABLE {table}")
+        cursor.execute(TABLE_DDL[table])
+        cursor.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", rows)
+
+    def _migrate_v1_child_profiles(self, cursor):
+        """v1: 兄弟対応。UNIQUE(date) → UNIQUE(child_id, date)、既存データは child_id=1 へ。
+        daily_schedules は v2、history は v3 で作り直すので、そっちでまとめて child_id を付けるっぴ。"""
+        if "child_id" not in self._columns(cursor, "schedule_rules"):
+            cursor.execute(f"ALTER TABLE schedule_rules ADD COLUMN child_id INTEGER NOT NULL DEFAULT {DEFAULT_CHILD_ID}")
+
+    def _migrate_v2_schedule_plans(self, cursor):
+        """v2: 日付ごとの中身を schedule_plans へ寄せて、daily_schedules は (child_id, date, plan_id) だけにするっぴ。"""
+        columns = self._columns(cursor, "daily_schedules")
+        if "plan_id" in columns:
+            return
+        # 中身はこの時点で v3 の型にそろえるっぴ（全部変換できてから古い表を消す）
+        converted = [
+            (row.get("child_id", DEFAULT_CHILD_ID), _legacy_day(row["date"]),
+             self._store_plan(cursor, self._legacy_plan_values(row)))
+            for row in self._read_rows(cursor, "daily_schedules")
+        ]
+        cursor.execute("DROP TABLE daily_schedules")
+        cursor.execute(TABLE_DDL["daily_schedules"])
+        cursor.executemany(self._UPSERT_SCHEDULE_SQL, converted)
+
+    @staticmethod
+    def _legacy_plan_values(row):
+        return [row.get("item_ids"), row.get("departure_message"), row.get("return_message"),
+                _legacy_flag(row.get("is_time_restricted")),
+                _legacy_minutes(row.get("start_time")), _legacy_minutes(row.get("end_time"))]
+
+    def _migrate_v3_typed_columns(self, cursor):
+        """v3: 文字列で持っていた日付・時刻・フラグ・status を数値にするっぴ。"""
+        if "start_time" in self._columns(cursor, "schedule_plans"):
+            # IDはそのまま（daily_schedules が指しているので）、ハッシュだけ新しい型で計算し直すっぴ
+            converted = []
+            for row in self._read_rows(cursor, "schedule_plans"):
+                values = self._normalize_plan(self._legacy_plan_values(row))
+                converted.append([row["id"], self._plan_hash(values)] + values)
+            self._rebuild_table(cursor, "schedule_plans", ("id", "hash") + PLAN_FIELDS, converted)
+
+        # 日付は julianday() だと読めない行が NULL になるので、Python で変換してから作り直すっぴ
+        if "date" in self._columns(cursor, "daily_schedules"):
+            self._rebuild_table(cursor, "daily_schedules", ("id", "child_id", "day", "plan_id"), [
+                (row["id"], row.get("child_id", DEFAULT_CHILD_ID), _legacy_day(row["date"]), row["plan_id"])
+                for row in self._read_rows(cursor, "daily_schedules")
+            ])
+
+        if "date" in self._columns(cursor, "history"):
+            self._rebuild_table(cursor, "history",
+                                ("id", "child_id", "day", "status", "departure_sec", "points", "created_at"), [
+                (row["id"], row.get("child_id", DEFAULT_CHILD_ID), _legacy_day(row["date"]),
+                 STATUS_SUCCESS if row["status"] == "success" else 0, _legacy_seconds(row.get("departure_time")),
+                 row.get("points") or 0, row.get("created_at"))
+                for row in self._read_rows(cursor, "history")
+            ])
+
+        if "date" in self._columns(cursor, "item_checks"):
+            self._rebuild_table(cursor, "item_checks", ("child_id", "day", "checked_ids", "updated_at"), [
+                (row["child_id"], _legacy_day(row["date"]), row["checked_ids"], row["updated_at"])
+                for row in self._read_rows(cursor, "item_checks")
+            ])
+
+        if "last_departure_date" in self._columns(cursor, "achievement_summary"):
+            self._rebuild_table(cursor, "achievement_summary",
+                                ("child_id", "total_points", "current_streak", "best_streak", "last_departure_day",
+                                 "month_key", "month_departures", "badges"), [
+                (row["child_id"], row["total_points"], row["current_streak"], row["best_streak"],
+                 _legacy_day(row["last_departure_date"]), row["month_key"], row["month_departures"], row["badges"])
+                for row in self._read_rows(cursor, "achievement_summary")
+            ])
+
+        # 除外日のCSVは Python で日数に直すっぴ
+        if "start_date" in self._columns(cursor, "schedule_rules"):
+            self._rebuild_table(cursor, "schedule_rules",
+                                ("id", "child_id", "weekday_mask", "start_day", "end_day", "exceptions") + PLAN_FIELDS, [
+                (row["id"], row.get("child_id", DEFAULT_CHILD_ID), row["weekday_mask"],
+                 _legacy_day(row["start_date"]), _legacy_day(row.get("end_date")),
+                 ",".join(str(_legacy_day(x.strip())) for x in (row.get("exceptions") or "").split(",") if x.strip()),
+                 *self._legacy_plan_values(row))
+                for row in self._read_rows(cursor, "schedule_rules")
+            ])
+
+    def _migrate_v4_schedule_versions(self, cursor):
+        """v4: 同じ日を2人で同時に直しても上書きし合わないよう、行ごとの版番号を足すっぴ。"""
+        if "version" not in self._columns(cursor, "daily_schedules"):
+            cursor.execute("ALTER TABLE daily_schedules ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+    def _migrate_v5_history_awards(self, cursor):
+        """v5: 出発を取り消したときに戻せるよう、その日にもらったバッジと前の最高連続記録を残すっぴ。"""
+        columns = self._columns(cursor, "history")
+        if "badges_awarded" not in columns:
+            cursor.execute("ALTER TABLE history ADD COLUMN badges_awarded TEXT")
+        if "prev_best_streak" not in columns:
+            cursor.execute("ALTER TABLE history ADD COLUMN prev_best_streak INTEGER")
+
+    def _migrate_v6_stats_last_day(self, cursor):
+        """v6: 最後に統計へ入れた日を覚えて、取り消し→押し直しで同じ日を二重に数えないようにするっぴ。"""
+        if "last_day" not in self._columns(cursor, "departure_stats"):
+            cursor.execute("ALTER TABLE departure_stats ADD COLUMN last_day INTEGER")
+
+    def _migrate_v7_drop_orphan_plans(self, cursor):
+        """v7: これまでの書き換えで置き去りになったプランを一度だけ片づけるっぴ（以後は書くたびに片づく）。"""
+        cursor.execute("DELETE FROM schedule_plans WHERE id NOT IN (SELECT plan_id FROM daily_schedules)")
+
+    @staticmethod
+    def _normalize_plan(values):
+        """文字列の欄は None → ""、フラグと時刻は None のまま（= 引き継ぎ）にそろえるっぴ。"""
+        values = list(values)
+        for i in range(3):
+            values[i] = values[i] or ""
+        return values
+
+    @staticmethod
+    def _plan_hash(values):
+        payload = json.dumps(values, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _store_plan(self, cursor, values):
+        """同じ中身のプランはハッシュで1つにまとめて、そのIDを返すっぴ。"""
+        values = self._normalize_plan(values)
+        plan_hash = self._plan_hash(values)
+        cursor.execute(f"INSERT OR IGNORE INTO schedule_plans (hash, {', '.join(PLAN_FIELDS)}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                       [plan_hash] + values)
+        return cursor.execute("SELECT id FROM schedule_plans WHERE hash = ?", (plan_hash,)).fetchone()[0]
+
+    @staticmethod
+    def _plan_ids_for_days(cursor, day_list, child_id):
+        """書き換える前に、その日たちが指しているプランを覚えておくっぴ。"""
+        plan_ids = set()
+        for i in range(0, len(day_list), 500):
+            chunk = list(day_list[i:i + 500])
+            cursor.execute(f"SELECT plan_id FROM daily_schedules WHERE child_id = ? AND day IN ({','.join('?' * len(chunk))})",
+                           [child_id] + chunk)
+            plan_ids.update(row[0] for row in cursor.fetchall())
+        return plan_ids
+
+    def _drop_orphan_plans(self, cursor, plan_ids):
+        """plan_ids のうち、もうどの日からも指されていないプランを消すっぴ（同じトランザクションで）。"""
+        plan_ids = list(plan_ids)
+        if not plan_ids:
+            return
+        cursor.execute(f"""
+            DELETE FROM schedule_plans WHERE id IN ({','.join('?' * len(plan_ids))})
+            AND NOT EXISTS (SELECT 1 FROM daily_schedules WHERE daily_schedules.plan_id = schedule_plans.id)
+        """, plan_ids)
+        with self._plan_lock:
+            for plan_id in plan_ids:
+                self._plan_cache.pop(plan_id, None)
+
+    def _load_plans(self, cursor, plan_ids):
+        """plan_id → 中身 をキャッシュ優先で引いて、足りない分だけIN句1回で読むっぴ。"""
+        plans = {}
+        with self._plan_lock:
+            for plan_id in plan_ids:
+                if plan_id in self._plan_cache:
+                    self._plan_cache.move_to_end(plan_id)
+                    plans[plan_id] = self._plan_cache[plan_id]
+        missing = [p for p in set(plan_ids) if p not in plans]
+        if missing:
+            placeholders = ",".join("?" * len(missing))
+            cursor.execute(f"SELECT id, {', '.join(PLAN_FIELDS)} FROM schedule_plans WHERE id IN ({placeholders})", missing)
+            loaded = {row["id"]: {f: row[f] for f in PLAN_FIELDS} for row in cursor.fetchall()}
+            plans.update(loaded)
+            with self._plan_lock:
+                self._plan_cache.update(loaded)
+                while len(self._plan_cache) > PLAN_CACHE_SIZE:
+                    self._plan_cache.popitem(last=False)
+        return plans
+
+    def _with_plans(self, cursor, rows):
+        """(child_id, day, plan_id) の行に中身をくっつけて、1つの辞書にするっぴ。"""
+        rows = [dict(row) for row in rows]
+        plans = self._load_plans(cursor, [row["plan_id"] for row in rows])
+        for row in rows:
+            row.update(plans.get(row["plan_id"], {}))
+        return rows
+
     def get_items(self):
         """UI(main_view)が期待する『辞書のリスト』を返すっぴ！"""
         with self.get_connection() as conn:
@@ -103,42 +543,331 @@ class DatabaseManager:
             cursor.execute("DELETE FROM items WHERE id = ?", (item_id,))
             conn.commit()
 
-    def get_daily_schedule(self, date_str):
+    def get_daily_schedule(self, day, child_id=DEFAULT_CHILD_ID):
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM daily_schedules WHERE date = ?", (date_str,))
-            row = cursor.fetchone()
-            return dict(row) if row else None
+            cursor.execute("SELECT * FROM daily_schedules WHERE child_id = ? AND day = ?", (child_id, day))
+            rows = self._with_plans(cursor, cursor.fetchall())
+            return rows[0] if rows else None
+
+    _UPSERT_SCHEDULE_SQL = """
+        INSERT INTO daily_schedules (child_id, day, plan_id)
+        VALUES (?, ?, ?)
+        ON CONFLICT(child_id, day) DO UPDATE SET plan_id=excluded.plan_id, version=version + 1
+    """
+
+    def save_daily_schedule(self, day, item_ids, dep_msg, ret_msg, is_restricted, start_min, end_min, child_id=DEFAULT_CHILD_ID):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            old_plans = self._plan_ids_for_days(cursor, [day], child_id)
+            plan_id = self._store_plan(cursor, [item_ids, dep_msg, ret_msg, is_restricted, start_min, end_min])
+            cursor.execute(self._UPSERT_SCHEDULE_SQL, (child_id, day, plan_id))
+            self._drop_orphan_plans(cursor, old_plans - {plan_id})
+            conn.commit()
+
+    def _resolve_item_ids(self, cursor, names):
+        """名前→IDをIN句1回で引いて、無い名前だけexecutemanyでまとめて登録するっぴ。"""
+        if not names:
+            return []
+        placeholders = ",".join("?" * len(names))
+        cursor.execute(f"SELECT id, name FROM items WHERE name IN ({placeholders})", names)
+        found = {row["name"]: row["id"] for row in cursor.fetchall()}
 
-    def save_daily_schedule(self, date, item_ids, dep_msg, ret_msg, is_restricted, start_t, end_t):
+        missing = [n for n in names if n not in found]
+        if missing:
+            cursor.executemany("INSERT OR IGNORE INTO items (name, icon) VALUES (?, ?)", [(n, "🎒") for n in missing])
+            # executemany は lastrowid を返さないので、新規分だけ引き直すっぴ
+            placeholders = ",".join("?" * len(missing))
+            cursor.execute(f"SELECT id, name FROM items WHERE name IN ({placeholders})", missing)
+            found.update({row["name"]: row["id"] for row in cursor.fetchall()})
+        return [found[n] for n in names]
+
+    def resolve_item_ids(self, names):
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            item_ids = self._resolve_item_ids(cursor, names)
+            conn.commit()
+            return item_ids
+
+    def save_schedules_with_items(self, day_list, item_names, dep_msg, ret_msg, is_restricted, start_min, end_min,
+                                  child_id=DEFAULT_CHILD_ID):
+        """アイテム名の解決とスケジュールのUPSERTを1トランザクションで行うっぴ。
+        中身はプラン1行にまとめるので、日付ぶんの書き込みは plan_id を指すだけだっぴ。"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            item_ids = self._resolve_item_ids(cursor, item_names)
+            item_ids_str = ",".join(str(i) for i in item_ids)
+            old_plans = self._plan_ids_for_days(cursor, day_list, child_id)
+            plan_id = self._store_plan(cursor, [item_ids_str, dep_msg, ret_msg, is_restricted, start_min, end_min])
+            cursor.executemany(self._UPSERT_SCHEDULE_SQL, [(child_id, day, plan_id) for day in day_list])
+            self._drop_orphan_plans(cursor, old_plans - {plan_id})
+            conn.commit()
+            return item_ids
+
+    def save_schedule_if_version(self, day, expected_version, item_names, dep_msg, ret_msg, is_restricted,
+                                 start_min, end_min, child_id=DEFAULT_CHILD_ID):
+        """読んだときの版（行が無かったら None）のままのときだけ書くっぴ。
+        書けたら item_ids、誰かが先に書いていたら何も変えずに None を返すっぴ。"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            item_ids = self._resolve_item_ids(cursor, item_names)
+            item_ids_str = ",".join(str(i) for i in item_ids)
+            old_plans = self._plan_ids_for_days(cursor, [day], child_id)
+            plan_id = self._store_plan(cursor, [item_ids_str, dep_msg, ret_msg, is_restricted, start_min, end_min])
+            if expected_version is None:
+                cursor.execute("""
+                    INSERT INTO daily_schedules (child_id, day, plan_id) VALUES (?, ?, ?)
+                    ON CONFLICT(child_id, day) DO NOTHING
+                """, (child_id, day, plan_id))
+            else:
+                cursor.execute("""
+                    UPDATE daily_schedules SET plan_id = ?, version = version + 1
+                    WHERE child_id = ? AND day = ? AND version = ?
+                """, (plan_id, child_id, day, expected_version))
+            if cursor.rowcount != 1:
+                conn.rollback()
+                return None
+            self._drop_orphan_plans(cursor, old_plans - {plan_id})
+            conn.commit()
+            return item_ids
+
+    def _select_daily_schedules(self, cursor, start_day, end_day, child_id):
+        cursor.execute("SELECT * FROM daily_schedules WHERE child_id = ? AND day BETWEEN ? AND ?",
+                       (child_id, start_day, end_day))
+        return self._with_plans(cursor, cursor.fetchall())
+
+    def _select_schedule_rules(self, cursor, start_day, end_day, child_id):
+        if start_day is not None and end_day is not None:
+            cursor.execute("""
+                SELECT * FROM schedule_rules
+                WHERE child_id = ? AND start_day <= ? AND (end_day IS NULL OR end_day >= ?)
+                ORDER BY id
+            """, (child_id, end_day, start_day))
+        else:
+            cursor.execute("SELECT * FROM schedule_rules WHERE child_id = ? ORDER BY id", (child_id,))
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_daily_schedules_range(self, start_day, end_day, child_id=DEFAULT_CHILD_ID):
+        """期間内の日付指定スケジュール（上書き分）をまとめて返すっぴ。"""
+        with self.get_connection() as conn:
+            return self._select_daily_schedules(conn.cursor(), start_day, end_day, child_id)
+
+    def get_schedule_rules(self, start_day=None, end_day=None, child_id=DEFAULT_CHILD_ID):
+        """期間に掛かる繰り返しルールを返すっぴ（省略時は全部）。"""
+        with self.get_connection() as conn:
+            return self._select_schedule_rules(conn.cursor(), start_day, end_day, child_id)
+
+    def get_month_schedule_data(self, start_day, end_day, child_id=DEFAULT_CHILD_ID):
+        """1か月分のルールと上書き分（version つき）を1回の接続でまとめて読むっぴ。"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            rules = self._select_schedule_rules(cursor, start_day, end_day, child_id)
+            overrides = self._select_daily_schedules(cursor, start_day, end_day, child_id)
+            return rules, overrides
+
+    def save_schedule_rule(self, weekday_mask, start_day, end_day, exceptions, item_names,
+                           dep_msg, ret_msg, is_restricted, start_min, end_min, child_id=DEFAULT_CHILD_ID):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            item_ids = self._resolve_item_ids(cursor, item_names)
             cursor.execute("""
-                INSERT INTO daily_schedules (date, item_ids, departure_message, return_message, is_time_restricted, start_time, end_time)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(date) DO UPDATE SET
-                    item_ids=excluded.item_ids, departure_message=excluded.departure_message,
-                    return_message=excluded.return_message, is_time_restricted=excluded.is_time_restricted,
-                    start_time=excluded.start_time, end_time=excluded.end_time
-            """, (date, item_ids, dep_msg, ret_msg, is_restricted, start_t, end_t))
+                INSERT INTO schedule_rules (child_id, weekday_mask, start_day, end_day, exceptions, item_ids,
+                                            departure_message, return_message, is_time_restricted, start_min, end_min)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (child_id, weekday_mask, start_day, end_day, exceptions, ",".join(str(i) for i in item_ids),
+                  dep_msg, ret_msg, is_restricted, start_min, end_min))
+            conn.commit()
+            return item_ids
+
+    def delete_schedule_rule(self, rule_id):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM schedule_rules WHERE id = ?", (rule_id,))
             conn.commit()
 
-    def save_history(self, date_str, status, departure_time):
+    def save_history(self, day, status, departure_sec, child_id=DEFAULT_CHILD_ID):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            self.upsert_history(cursor, day, status, departure_sec, child_id)
+            conn.commit()
+
+    @staticmethod
+    def upsert_history(cursor, day, status, departure_sec, child_id=DEFAULT_CHILD_ID):
+        """トランザクション内で使う版。既存の行（あれば）を返すっぴ。"""
+        cursor.execute("SELECT * FROM history WHERE child_id = ? AND day = ?", (child_id, day))
+        previous = cursor.fetchone()
+        cursor.execute("""
+            INSERT INTO history (child_id, day, status, departure_sec) VALUES (?, ?, ?, ?)
+            ON CONFLICT(child_id, day) DO UPDATE SET status=excluded.status, departure_sec=excluded.departure_sec
+        """, (child_id, day, status, departure_sec))
+        return dict(previous) if previous else None
+
+    @staticmethod
+    def load_departure_stats(cursor, child_id, weekday):
+        cursor.execute("SELECT * FROM departure_stats WHERE child_id = ? AND weekday = ?", (child_id, weekday))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+    @staticmethod
+    def store_departure_stats(cursor, child_id, weekday, count, ewma_minutes, sketch, last_day=None):
+        cursor.execute("""
+            INSERT INTO departure_stats (child_id, weekday, count, ewma_minutes, sketch, last_day) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(child_id, weekday) DO UPDATE SET
+                count=excluded.count, ewma_minutes=excluded.ewma_minutes, sketch=excluded.sketch,
+                last_day=excluded.last_day
+        """, (child_id, weekday, count, ewma_minutes, sketch, last_day))
+
+    @staticmethod
+    def set_history_points(cursor, day, points, child_id=DEFAULT_CHILD_ID, badges_awarded=None, prev_best_streak=None):
+        """その日のポイントと、取り消し用にもらったバッジ（キーのJSON）と前の最高連続記録を書くっぴ。"""
+        cursor.execute(
+            "UPDATE history SET points = ?, badges_awarded = ?, prev_best_streak = ? WHERE child_id = ? AND day = ?",
+            (points, badges_awarded, prev_best_streak, child_id, day)
+        )
+
+    @staticmethod
+    def delete_history_row(cursor, day, child_id=DEFAULT_CHILD_ID):
+        """消した行（あれば）を返すっぴ。"""
+        cursor.execute("SELECT * FROM history WHERE child_id = ? AND day = ?", (child_id, day))
+        row = cursor.fetchone()
+        cursor.execute("DELETE FROM history WHERE child_id = ? AND day = ?", (child_id, day))
+        return dict(row) if row else None
+
+    @staticmethod
+    def last_departure_before(cursor, day, child_id=DEFAULT_CHILD_ID):
+        cursor.execute(
+            "SELECT MAX(day) FROM history WHERE child_id = ? AND day < ? AND status = ?",
+            (child_id, day, STATUS_SUCCESS)
+        )
+        return cursor.fetchone()[0]
+
+    @staticmethod
+    def load_achievement_summary(cursor, child_id):
+        cursor.execute("SELECT * FROM achievement_summary WHERE child_id = ?", (child_id,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+    @staticmethod
+    def store_achievement_summary(cursor, summary):
+        cursor.execute("""
+            INSERT INTO achievement_summary (child_id, total_points, current_streak, best_streak,
+                                             last_departure_day, month_key, month_departures, badges)
+            VALUES (:child_id, :total_points, :current_streak, :best_streak,
+                    :last_departure_day, :month_key, :month_departures, :badges)
+            ON CONFLICT(child_id) DO UPDATE SET
+                total_points=excluded.total_points, current_streak=excluded.current_streak,
+                best_streak=excluded.best_streak, last_departure_day=excluded.last_departure_day,
+                month_key=excluded.month_key, month_departures=excluded.month_departures, badges=excluded.badges
+        """, summary)
+
+    def get_achievement_summary(self, child_id=DEFAULT_CHILD_ID):
+        with self.get_connection() as conn:
+            return self.load_achievement_summary(conn.cursor(), child_id)
+
+    def save_item_checks(self, child_id, day, checked_ids):
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                INSERT INTO history (date, status, departure_time) VALUES (?, ?, ?)
-                ON CONFLICT(date) DO UPDATE SET status=excluded.status, departure_time=excluded.departure_time
-            """, (date_str, status, departure_time))
+                INSERT INTO item_checks (child_id, day, checked_ids, updated_at) VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(child_id, day) DO UPDATE SET checked_ids=excluded.checked_ids, updated_at=excluded.updated_at
+            """, (child_id, day, ",".join(str(i) for i in sorted(checked_ids))))
             conn.commit()
 
-    def get_history(self, date_str):
+    def get_item_checks(self, child_id, day):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT checked_ids FROM item_checks WHERE child_id = ? AND day = ?", (child_id, day))
+            row = cursor.fetchone()
+            return {int(i) for i in row[0].split(",") if i.isdigit()} if row else set()
+
+    @staticmethod
+    def bump_item_stats(cursor, child_id, item_ids, checked_ids, sign=1):
+        """出発した日の持ち物ぶん、予定/チェック/忘れ のカウンタをまとめて足す（sign=-1 で取り消し）。"""
+        rows = []
+        for item_id in item_ids:
+            ticked = 1 if item_id in checked_ids else 0
+            rows.append((child_id, item_id, sign, sign * ticked, sign * (1 - ticked)))
+        cursor.executemany("""
+            INSERT INTO item_stats (child_id, item_id, scheduled_count, ticked_count, forgotten_count)
+            VALUES (?, ?, MAX(?, 0), MAX(?, 0), MAX(?, 0))
+            ON CONFLICT(child_id, item_id) DO UPDATE SET
+                scheduled_count = MAX(0, scheduled_count + ?),
+                ticked_count = MAX(0, ticked_count + ?),
+                forgotten_count = MAX(0, forgotten_count + ?)
+        """, [row + row[2:] for row in rows])
+
+    def get_item_stats(self, child_id=DEFAULT_CHILD_ID):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT s.item_id, i.name, i.icon, s.scheduled_count, s.ticked_count, s.forgotten_count
+                FROM item_stats s JOIN items i ON i.id = s.item_id
+                WHERE s.child_id = ?
+            """, (child_id,))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def get_item_usage(self):
+        """持ち物ごとの出発日での登場回数（きょうだい合計）だっぴ。オートコンプリートの並び順に使うっぴ。"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM history WHERE date = ?", (date_str,))
+            cursor.execute("SELECT item_id, SUM(scheduled_count) AS n FROM item_stats GROUP BY item_id")
+            return {row["item_id"]: row["n"] for row in cursor.fetchall()}
+
+    def get_departure_stats(self, child_id=DEFAULT_CHILD_ID):
+        """曜日 → 統計行 の辞書を返すっぴ。"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM departure_stats WHERE child_id = ?", (child_id,))
+            return {row["weekday"]: dict(row) for row in cursor.fetchall()}
+
+    def get_history(self, day, child_id=DEFAULT_CHILD_ID):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM history WHERE child_id = ? AND day = ?", (child_id, day))
             row = cursor.fetchone()
             return dict(row) if row else None
 
+    def get_history_range(self, start_day, end_day, child_id=DEFAULT_CHILD_ID):
+        """start_day〜end_day（両端含む）の履歴を1クエリでまとめて返すっぴ。"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT day, status, departure_sec, points FROM history WHERE child_id = ? AND day BETWEEN ? AND ? ORDER BY day",
+                (child_id, start_day, end_day)
+            )
+            return [dict(row) for row in cursor.fetchall()]
+
+    def delete_history(self, day, child_id=DEFAULT_CHILD_ID):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM history WHERE child_id = ? AND day = ?", (child_id, day))
+            conn.commit()
+
+    def get_children(self):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM children ORDER BY id ASC")
+            return [dict(row) for row in cursor.fetchall()]
+
+    def add_child(self, name, icon):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("INSERT INTO children (name, icon) VALUES (?, ?)", (name, icon))
+            conn.commit()
+            return cursor.lastrowid
+
+    def get_children_overview(self, day):
+        """全員分の今日の状況を1クエリで返すっぴ（(child_id, day) のUNIQUEインデックスを使う）。"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT c.id, c.name, c.icon, h.status, h.departure_sec
+                FROM children c
+                LEFT JOIN history h ON h.child_id = c.id AND h.day = ?
+                ORDER BY c.id
+            """, (day,))
+            return [dict(row) for row in cursor.fetchall()]
+
     def save_setting(self, key, value):
         with self.get_connection() as conn:
             cursor = conn.cursor()
@@ -0,0 +1,172 @@
+"""
+In-memory autocomplete index over item names.
+
+Names are folded (NFKC, case-folded, katakana -> hiragana, whitespace removed)
+so that "ハンカチ", "はんかち" and "ﾊﾝｶﾁ" land on the same trie key. Each key
+maps back to the existing item, which lets the save path reuse its ID instead
+of inserting a near-duplicate row.
+"""
+import unicodedata
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_KATAKANA_START = 0x30A1
+_KATAKANA_END = 0x30F6
+_KANA_OFFSET = 0x60
+# Terminal marker; None can never collide with a name character
+_END = None
+
+
+def fold_name(name: str) -> str:
+    """Normalizes an item name into its lookup key."""
+    text = unicodedata.normalize("NFKC", name or "").casefold()
+    chars = []
+    for ch in text:
+        if ch.isspace():
+            continue
+        code = ord(ch)
+        if _KATAKANA_START <= code <= _KATAKANA_END:
+            ch = chr(code - _KANA_OFFSET)
+        chars.append(ch)
+    return "".join(chars)
+
+
+class ItemIndex:
+    """Character trie of folded item names, ranked by usage count."""
+
+    def __init__(self):
+        self._root: dict = {}
+        self._names: Dict[int, str] = {}
+        self._keys: Dict[int, str] = {}
+        self._usage: Dict[int, int] = {}
+
+    def build(self, items: Iterable[dict], usage: Optional[Dict[int, int]] = None):
+        self.__init__()
+        for item in items:
+            self.add(item["id"], item["name"])
+        for item_id, count in (usage or {}).items():
+            if item_id in self._names:
+                self._usage[item_id] = count
+
+    def add(self, item_id: int, name: str):
+        """Inserts or renames one item (idempotent)."""
+        if self._names.get(item_id) == name:
+            return
+        if item_id in self._names:
+            self.remove(item_id)
+        key = fold_name(name)
+        node = self._root
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node.setdefault(_END, set()).add(item_id)
+        self._names[item_id] = name
+        self._keys[item_id] = key
+        self._usage.setdefault(item_id, 0)
+
+    def remove(self, item_id: int):
+        key = self._keys.pop(item_id, None)
+        self._names.pop(item_id, None)
+        self._usage.pop(item_id, None)
+        if key is None:
+            return
+        # Walk down remembering the path so empty branches can be pruned
+        path = [(None, self._root)]
+        node = self._root
+        for ch in key:
+            node = node.get(ch)
+            if node is None:
+                return
+            path.append((ch, node))
+        node.get(_END, set()).discard(item_id)
+        if not node.get(_END):
+            node.pop(_END, None)
+        for i in range(len(path) - 1, 0, -1):
+            ch, child = path[i]
+            if child:
+                break
+            path[i - 1][1].pop(ch, None)
+
+    def bump(self, item_ids: Iterable[int], amount: int = 1):
+        for item_id in item_ids:
+            if item_id in self._usage:
+                self._usage[item_id] = max(0, self._usage[item_id] + amount)
+
+    def _node(self, key: str) -> Optional[dict]:
+        node = self._root
+        for ch in key:
+            node = node.get(ch)
+            if node is None:
+                return None
+        return node
+
+    def lookup(self, name: str) -> Optional[int]:
+        """ID of the existing item that folds to the same key, preferring the most used one."""
+        node = self._node(fold_name(name))
+        if not node or not node.get(_END):
+            return None
+        return max(node[_END], key=lambda i: (self._usage.get(i, 0), -i))
+
+    def name(self, item_id: int) -> Optional[str]:
+        return self._names.get(item_id)
+
+    def canonical(self, name: str) -> Optional[str]:
+        item_id = self.lookup(name)
+        return self._names[item_id] if item_id is not None else None
+
+    def suggest(self, prefix: str, limit: int = 5) -> List[str]:
+        """Item names starting with the folded prefix, most used first."""
+        key = fold_name(prefix)
+        if not key:
+            return []
+        node = self._node(key)
+        if node is None:
+            return []
+        ids = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            for ch, child in current.items():
+                if ch is _END:
+                    ids.extend(child)
+                else:
+                    stack.append(child)
+        ids.sort(key=lambda i: (-self._usage.get(i, 0), len(self._keys[i]), self._names[i]))
+        return [self._names[i] for i in ids[:limit]]
+
+
+class ItemDateIndex:
+    """item_id -> sorted ISO dates on which the item is scheduled, filled one month at a time."""
+
+    def __init__(self):
+        self._dates: Dict[int, List[str]] = {}
+        self._months = set()
+
+    def has_month(self, month: Tuple[int, int]) -> bool:
+        return month in self._months
+
+    def add_month(self, month: Tuple[int, int], day_items: Dict[str, List[int]]):
+        if month in self._months:
+            return
+        for d_str, item_ids in day_items.items():
+            for item_id in item_ids:
+                insort(self._dates.setdefault(item_id, []), d_str)
+        self._months.add(month)
+
+    def drop_month(self, month: Tuple[int, int]):
+        if month not in self._months:
+            return
+        prefix = f"{month[0]}-{month[1]:02d}-"
+        for dates in self._dates.values():
+            lo = bisect_left(dates, prefix)
+            hi = bisect_left(dates, prefix + "~", lo)
+            del dates[lo:hi]
+        self._months.discard(month)
+
+    def between(self, item_id: int, start_str: str, end_str: str) -> List[str]:
+        dates = self._dates.get(item_id, [])
+        return dates[bisect_left(dates, start_str):bisect_right(dates, end_str)]
+
+    def first_from(self, item_id: int, start_str: str) -> Optional[str]:
+        dates = self._dates.get(item_id, [])
+        i = bisect_left(dates, start_str)
+        return dates[i] if i < len(dates) else None
@@ -1,66 +1,671 @@
 from datetime import datetime, date, timedelta
 from typing import List, Dict, Optional
-from models.db_manager import DatabaseManager
+from models.db_manager import (DatabaseManager, DEFAULT_CHILD_ID, STATUS_SUCCESS, STATUS_NAMES,
+                               day_number, day_date, minute_of_day, time_of_minute)
+from models.clock import SystemClock, DayEpoch
+from models.stats import DepartureStats
+from models.check_writer import DebouncedCheckWriter
+from models.item_index import ItemIndex, ItemDateIndex
+from models import achievements
+from consts.defaults import DEFAULT_START_MIN, DEFAULT_END_MIN, SCHEDULE_DEFAULTS_KEY
+import calendar
+import json
 import sqlite3
+import threading
+
+WEEKDAY_LABELS = ["月", "火", "水", "木", "金", "土", "日"]  # date.weekday() order
+PROFILE_FIELDS = ("item_ids", "departure_message", "return_message", "is_time_restricted", "start_min", "end_min")
+WINDOW_FIELDS = ("is_time_restricted", "start_min", "end_min")
+# Passed as expected_version to save without a version check
+UNCHECKED = object()
+
+
+def _is_set(value) -> bool:
+    # 0 is a real value for flags and times; only None/"" mean "not set"
+    return value is not None and value != ""
+
+
+def _has_items(item_ids_str: Optional[str]) -> bool:
+    return any(i.strip().isdigit() for i in (item_ids_str or "").split(","))
+
+
+def _format_seconds(seconds: Optional[int]) -> str:
+    if seconds is None:
+        return ""
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
 
 class LogicManager:
     """
     Handles business logic for the application.
     Implements Mode Logic and Data Persistence with safe connection handling.
     """
-    def __init__(self, db_manager: DatabaseManager):
+    def __init__(self, db_manager: DatabaseManager, clock=None):
         self.db = db_manager
+        # All "now"/"today" lookups go through the clock so simulations can drive time
+        self.clock = clock or SystemClock()
+        # Bumped once per process at midnight; sessions compare it instead of polling the date
+        self.day_epoch = DayEpoch(self.clock)
+        if isinstance(self.clock, SystemClock):
+            self.day_epoch.start()
+        # Resolved schedules memoized per (child_id, year, month); shared by every session
+        self._month_cache: Dict[tuple, Dict[str, dict]] = {}
+        self._cache_lock = threading.Lock()
+        # Bumped on every invalidation so a load that raced a write does not store stale data
+        self._cache_generation = 0
+        # Month keys currently being loaded by a background prefetch
+        self._prefetching = set()
+        # Household default profile and the per-date merge results built on top of it
+        self._defaults: Optional[dict] = None
+        self._resolved_cache: Dict[tuple, dict] = {}
+        self._children: Optional[List[dict]] = None
+        # Checklist ticks: read-through cache in front of a debounced writer
+        self.check_writer = DebouncedCheckWriter(self.db.save_item_checks)
+        self._checks_cache: Dict[tuple, frozenset] = {}
+        # Folded-name trie for autocomplete / duplicate-free saves, built on first use
+        self._item_index: Optional[ItemIndex] = None
+        # Per-child item -> scheduled dates, filled lazily per month and dropped with the month cache
+        self._item_dates: Dict[int, ItemDateIndex] = {}
 
-    def get_current_mode(self) -> Dict[str, any]:
-        """
-        Determines the current application mode safely.
-        """
-        today_str = date.today().isoformat()
-        current_dt = datetime.now()
-        
+    # --- Schedule resolution (per-date overrides > recurring rules) ---
+    def _month_schedules(self, year: int, month: int, child_id: int = DEFAULT_CHILD_ID) -> Dict[str, dict]:
+        """Returns {date_str: schedule} for a month, expanding recurring rules lazily."""
+        key = (child_id, year, month)
+        with self._cache_lock:
+            cached = self._month_cache.get(key)
+            generation = self._cache_generation
+        if cached is not None:
+            return cached
+
+        first = date(year, month, 1)
+        first_day = day_number(first)
+        last_day = first_day + calendar.monthrange(year, month)[1] - 1
+
+        resolved = {}
         try:
-            history = self.db.get_history(today_str)
-            
-            if not history or history.get("status") != "success":
-                msg = f"Mode check: No record for {today_str} (morning)"
-                return {"mode": "morning", "debug_msg": msg}
-            
-            dep_time_str = history.get("departure_time", "00:00:00")
-            msg = f"Mode check: Found record at {dep_time_str}"
-            
+            rules, overrides = self.db.get_month_schedule_data(first_day, last_day, child_id)
+        except Exception as e:
+            print(f"[ERROR] _month_schedules: {e}")
+            return {}
+
+        if rules:
+            for r in rules:
+                r["exception_days"] = {int(x) for x in (r.get("exceptions") or "").split(",") if x.strip()}
+            for day in range(first_day, last_day + 1):
+                d = day_date(day)
+                matched = [r for r in rules if self._rule_matches(r, d, day)]
+                if matched:
+                    d_str = d.isoformat()
+                    resolved[d_str] = self._merge_rules(d_str, matched)
+
+        for row in overrides:
+            row["source"] = "override"
+            row["date"] = day_date(row["day"]).isoformat()
+            resolved[row["date"]] = row
+
+        with self._cache_lock:
+            if generation == self._cache_generation:
+                self._month_cache[key] = resolved
+        return resolved
+
+    def prefetch_months(self, year: int, month: int, child_id: int = DEFAULT_CHILD_ID):
+        """Warms the months before and after (year, month) on a background thread."""
+        first = date(year, month, 1)
+        prev_month = first - timedelta(days=1)
+        next_month = first + timedelta(days=calendar.monthrange(year, month)[1])
+        keys = []
+        with self._cache_lock:
+            for d in (prev_month, next_month):
+                key = (child_id, d.year, d.month)
+                if key not in self._month_cache and key not in self._prefetching:
+                    self._prefetching.add(key)
+                    keys.append(key)
+        if not keys:
+            return
+
+        def _load():
+            for key in keys:
+                try:
+                    self._month_schedules(key[1], key[2], key[0])
+                finally:
+                    with self._cache_lock:
+                        self._prefetching.discard(key)
+
+        threading.Thread(target=_load, name="month-prefetch", daemon=True).start()
+
+    @staticmethod
+    def _rule_matches(rule: dict, d: date, day: int) -> bool:
+        if not rule["weekday_mask"] & (1 << d.weekday()):
+            return False
+        if day < rule["start_day"]:
+            return False
+        if rule.get("end_day") is not None and day > rule["end_day"]:
+            return False
+        return day not in rule["exception_days"]
+
+    @staticmethod
+    def _merge_rules(d_str: str, rules: List[dict]) -> dict:
+        """Rules are additive: items are unioned, the newest rule wins for messages and time."""
+        item_ids = []
+        for r in rules:
+            for i in (r.get("item_ids") or "").split(","):
+                if i.strip().isdigit() and i.strip() not in item_ids:
+                    item_ids.append(i.strip())
+        merged = {"date": d_str, "item_ids": ",".join(item_ids), "source": "rule"}
+        for field in ("departure_message", "return_message"):
+            merged[field] = next((r[field] for r in reversed(rules) if r.get(field)), "")
+        for field in WINDOW_FIELDS:
+            merged[field] = next((r[field] for r in reversed(rules) if _is_set(r.get(field))), None)
+        return merged
+
+    def _get_schedule(self, date_str: str, child_id: int = DEFAULT_CHILD_ID) -> Optional[dict]:
+        d = date.fromisoformat(date_str)
+        return self._month_schedules(d.year, d.month, child_id).get(date_str)
+
+    def _invalidate_schedules(self, date_list: Optional[List[str]] = None, child_id: Optional[int] = None):
+        """Drops memoized months touched by date_list (or everything when None)."""
+        with self._cache_lock:
+            self._cache_generation += 1
+            self._resolved_cache.clear()
+            if date_list is None or child_id is None:
+                self._month_cache.clear()
+                self._item_dates.clear()
+                return
+            date_index = self._item_dates.get(child_id)
+            for d_str in date_list:
+                d = date.fromisoformat(d_str)
+                self._month_cache.pop((child_id, d.year, d.month), None)
+                if date_index:
+                    date_index.drop_month((d.year, d.month))
+
+    # --- Household defaults (settings) and read-time inheritance ---
+    def _load_defaults(self) -> dict:
+        if self._defaults is None:
+            raw = self.db.get_setting(SCHEDULE_DEFAULTS_KEY)
             try:
-                t = datetime.strptime(dep_time_str, "%H:%M:%S").time()
-            except:
-                t = datetime.strptime(dep_time_str, "%H:%M").time()
-
-            dep_dt = datetime.combine(date.today(), t)
-            diff = current_dt - dep_dt
-            hours_passed = diff.total_seconds() / 3600
-            
-            if hours_passed < 4:
-                return {"mode": "departure", "dep_time": dep_time_str, "debug_msg": f"Mode: Departure ({hours_passed:.2f}h passed)"}
+                profile = json.loads(raw) if raw else {}
+            except ValueError:
+                profile = {}
+            profile.setdefault("all", {})
+            profile.setdefault("weekdays", {})
+            for layer in [profile["all"]] + list(profile["weekdays"].values()):
+                self._upgrade_layer(layer)
+            self._defaults = profile
+        return self._defaults
+
+    @staticmethod
+    def _upgrade_layer(layer: dict):
+        """Profiles saved before v3 used "true"/"false" and "HH:MM" strings; convert them once on load."""
+        if isinstance(layer.get("is_time_restricted"), str):
+            layer["is_time_restricted"] = 1 if layer["is_time_restricted"] == "true" else 0
+        for old, new in (("start_time", "start_min"), ("end_time", "end_min")):
+            value = layer.pop(old, None)
+            if value and new not in layer:
+                hour, minute = value.split(":")[:2]
+                layer[new] = int(hour) * 60 + int(minute)
+
+    def _defaults_for(self, weekday: int) -> dict:
+        """Global defaults overlaid with the weekday-specific profile."""
+        profile = self._load_defaults()
+        base = {
+            "item_ids": "", "departure_message": "", "return_message": "",
+            "is_time_restricted": 0, "start_min": DEFAULT_START_MIN, "end_min": DEFAULT_END_MIN,
+        }
+        # A key that is present overrides, even when empty ("" clears inherited items/messages);
+        # a missing key or None inherits
+        for layer in (profile["all"], profile["weekdays"].get(str(weekday), {})):
+            for field in PROFILE_FIELDS:
+                if layer.get(field) is not None:
+                    base[field] = layer[field]
+        return base
+
+    def _resolve(self, date_str: str, child_id: int = DEFAULT_CHILD_ID) -> dict:
+        """Day schedule merged over the household defaults (cached until the next write)."""
+        key = (child_id, date_str)
+        with self._cache_lock:
+            cached = self._resolved_cache.get(key)
+            generation = self._cache_generation
+        if cached is not None:
+            return cached
+
+        merged = self._defaults_for(date.fromisoformat(date_str).weekday())
+        schedule = self._get_schedule(date_str, child_id)
+        if schedule:
+            # Base items come first, day items are appended
+            ids = [i for i in merged["item_ids"].split(",") if i.strip()]
+            for i in (schedule.get("item_ids") or "").split(","):
+                if i.strip().isdigit() and i.strip() not in ids:
+                    ids.append(i.strip())
+            merged["item_ids"] = ",".join(ids)
+            for field in ("departure_message", "return_message"):
+                if schedule.get(field):
+                    merged[field] = schedule[field]
+            # A NULL restriction flag means "inherit the whole time window"
+            if schedule.get("is_time_restricted") is not None:
+                for field in WINDOW_FIELDS:
+                    if schedule.get(field) is not None:
+                        merged[field] = schedule[field]
+
+        # A write that landed while we were merging may have made this stale; don't keep it then
+        with self._cache_lock:
+            if generation == self._cache_generation:
+                self._resolved_cache[key] = merged
+        return merged
+
+    def _item_names(self, item_ids_str: Optional[str]) -> List[str]:
+        """Item names in the stored order (served from the item index, no query once built)."""
+        index = self._get_item_index()
+        with self._cache_lock:
+            names = [index.name(int(i)) for i in (item_ids_str or "").split(",") if i.strip().isdigit()]
+        return [n for n in names if n is not None]
+
+    # --- Item name index ---
+    def _get_item_index(self) -> ItemIndex:
+        with self._cache_lock:
+            if self._item_index is None:
+                index = ItemIndex()
+                index.build(self.db.get_items(), self.db.get_item_usage())
+                self._item_index = index
+            return self._item_index
+
+    def _clean_item_names(self, item_names: List[str]) -> List[str]:
+        """Drops blanks, maps spelling variants onto existing items and de-duplicates (order kept)."""
+        index = self._get_item_index()
+        with self._cache_lock:
+            names = [index.canonical(n.strip()) or n.strip() for n in item_names if n.strip()]
+        return list(dict.fromkeys(names))
+
+    def _index_items(self, item_ids: List[int], names: List[str]):
+        index = self._get_item_index()
+        with self._cache_lock:
+            for item_id, name in zip(item_ids, names):
+                index.add(item_id, name)
+
+    def get_item_names(self) -> List[str]:
+        return [item["name"] for item in self.db.get_items()]
+
+    def _lookup_item_id(self, name: str) -> Optional[int]:
+        index = self._get_item_index()
+        with self._cache_lock:
+            return index.lookup(name)
+
+    def check_item_names(self, item_names: List[str]) -> Dict[str, list]:
+        """
+        What saving item_names would do to the item list, for the admin editor.
+        folded: (entered, existing) pairs where a spelling variant is mapped onto an existing item.
+        similar: (entered, [existing, ...]) for new names that are the start of existing ones.
+        """
+        index = self._get_item_index()
+        folded, similar = [], []
+        with self._cache_lock:
+            for name in dict.fromkeys(n.strip() for n in item_names if n.strip()):
+                existing = index.canonical(name)
+                if existing is None:
+                    candidates = index.suggest(name)
+                    if candidates:
+                        similar.append((name, candidates))
+                elif existing != name:
+                    folded.append((name, existing))
+        return {"folded": folded, "similar": similar}
+
+    # --- Item -> dates lookups ---
+    def _item_date_index(self, child_id: int, first: date, last: date) -> ItemDateIndex:
+        """Makes sure every month between first and last is in the child's item->dates index."""
+        months = []
+        y, m = first.year, first.month
+        while (y, m) <= (last.year, last.month):
+            months.append((y, m))
+            y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+        while True:
+            with self._cache_lock:
+                generation = self._cache_generation
+                date_index = self._item_dates.setdefault(child_id, ItemDateIndex())
+            for y, m in months:
+                if date_index.has_month((y, m)):
+                    continue
+                # Every day of the month, so items that come only from the defaults are found too
+                days = (date(y, m, d).isoformat() for d in range(1, calendar.monthrange(y, m)[1] + 1))
+                day_items = {d_str: self._day_item_ids(d_str, child_id) for d_str in days}
+                with self._cache_lock:
+                    # An edit landed while we were reading: the month may be stale and the index dropped
+                    if generation != self._cache_generation:
+                        break
+                    if not date_index.has_month((y, m)):
+                        date_index.add_month((y, m), day_items)
             else:
-                return {"mode": "return", "debug_msg": f"Mode: Return ({hours_passed:.2f}h passed)"}
+                return date_index
+
+    def get_dates_for_item(self, item_name: str, start: date, end: date,
+                           child_id: int = DEFAULT_CHILD_ID) -> List[str]:
+        """Dates in [start, end] whose resolved items (defaults included) contain the item (spelling variants allowed)."""
+        item_id = self._lookup_item_id(item_name)
+        if item_id is None:
+            return []
+        date_index = self._item_date_index(child_id, start, end)
+        with self._cache_lock:
+            return date_index.between(item_id, start.isoformat(), end.isoformat())
+
+    def next_date_for_item(self, item_name: str, child_id: int = DEFAULT_CHILD_ID,
+                           horizon_days: int = 366) -> Optional[str]:
+        """First date from today on whose resolved items (defaults included) contain the item, at most horizon_days ahead."""
+        item_id = self._lookup_item_id(item_name)
+        if item_id is None:
+            return None
+        today = self.clock.today()
+        limit = today + timedelta(days=horizon_days)
+        month_start = today
+        # Index month by month so the common "next week" answer never expands a whole year
+        while month_start <= limit:
+            month_end = date(month_start.year, month_start.month,
+                             calendar.monthrange(month_start.year, month_start.month)[1])
+            date_index = self._item_date_index(child_id, month_start, month_end)
+            with self._cache_lock:
+                found = date_index.first_from(item_id, today.isoformat())
+            if found and found <= min(month_end, limit).isoformat():
+                return found
+            month_start = month_end + timedelta(days=1)
+        return None
+
+    def get_defaults(self, weekday: Optional[int] = None) -> Dict[str, any]:
+        """
+        Returns the default profile for the admin UI.
+        weekday=None is the household-wide profile; otherwise the effective profile for that weekday.
+        """
+        if weekday is None:
+            layer = dict(self._defaults_for(-1))
+        else:
+            layer = self._defaults_for(weekday)
+        return {
+            "has_override": weekday is not None and str(weekday) in self._load_defaults()["weekdays"],
+            "item_names": self._item_names(layer["item_ids"]),
+            "departure_message": layer["departure_message"],
+            "return_message": layer["return_message"],
+            "is_restricted": bool(layer["is_time_restricted"]),
+            "start_time": time_of_minute(layer["start_min"]),
+            "end_time": time_of_minute(layer["end_min"]),
+        }
+
+    def save_defaults(self, weekday: Optional[int], is_restricted: bool, start_t, end_t,
+                      dep_msg: str, ret_msg: str, base_item_names: List[str]):
+        """Saves the household-wide (weekday=None) or a weekday default profile."""
+        clean_names = self._clean_item_names(base_item_names)
+        item_ids = self.db.resolve_item_ids(clean_names)
+        self._index_items(item_ids, clean_names)
+        layer = {
+            "item_ids": ",".join(str(i) for i in item_ids),
+            "departure_message": dep_msg,
+            "return_message": ret_msg,
+            "is_time_restricted": int(bool(is_restricted)),
+            "start_min": minute_of_day(start_t),
+            "end_min": minute_of_day(end_t),
+        }
+        profile = self._load_defaults()
+        if weekday is None:
+            profile["all"] = layer
+        else:
+            profile["weekdays"][str(weekday)] = layer
+        self._store_defaults(profile)
+
+    def clear_weekday_defaults(self, weekday: int):
+        profile = self._load_defaults()
+        profile["weekdays"].pop(str(weekday), None)
+        self._store_defaults(profile)
 
+    def _store_defaults(self, profile: dict):
+        self.db.save_setting(SCHEDULE_DEFAULTS_KEY, json.dumps(profile, ensure_ascii=False))
+        self._defaults = profile
+        with self._cache_lock:
+            self._cache_generation += 1
+            self._resolved_cache.clear()
+            self._item_dates.clear()
+
+    # --- Child profiles ---
+    def get_children(self) -> List[Dict[str, any]]:
+        if self._children is None:
+            self._children = self.db.get_children()
+        return self._children
+
+    def add_child(self, name: str, icon: str = "🧒") -> int:
+        child_id = self.db.add_child(name.strip(), icon)
+        self._children = None
+        return child_id
+
+    def get_children_overview(self) -> List[Dict[str, any]]:
+        """Every child's status for today from a single history query."""
+        today = self.clock.today()
+        today_str = today.isoformat()
+        overview = []
+        for row in self.db.get_children_overview(day_number(today)):
+            mode_info = self._mode_from_history(row, today_str)
+            overview.append({
+                "id": row["id"],
+                "name": row["name"],
+                "icon": row["icon"],
+                "mode": mode_info["mode"],
+                "dep_time": _format_seconds(row.get("departure_sec")),
+                "item_count": len([i for i in self._resolve(today_str, row["id"])["item_ids"].split(",") if i.strip()]),
+            })
+        return overview
+
+    def get_current_mode(self, child_id: int = DEFAULT_CHILD_ID) -> Dict[str, any]:
+        """
+        Determines the current application mode safely.
+        """
+        today = self.clock.today()
+        try:
+            history = self.db.get_history(day_number(today), child_id)
+            return self._mode_from_history(history, today.isoformat())
         except Exception as e:
             err = f"Mode determination failed: {e}"
             return {"mode": "morning", "debug_msg": err}
 
-    def record_departure(self):
-        """Records the current time as departure time."""
-        today_str = date.today().isoformat()
-        now_dt = datetime.now()
-        now_str = now_dt.strftime("%H:%M:%S")
-        self.db.save_history(today_str, "success", now_str)
-        return now_str
-
-    def get_items_for_today(self) -> List[dict]:
-        """Returns items for today using high-level db methods."""
-        today_str = date.today().isoformat()
-        schedule = self.db.get_daily_schedule(today_str)
+    def _mode_from_history(self, history: Optional[dict], today_str: str) -> Dict[str, any]:
+        if not history or history.get("status") != STATUS_SUCCESS:
+            msg = f"Mode check: No record for {today_str} (morning)"
+            return {"mode": "morning", "debug_msg": msg}
+
+        dep_sec = history.get("departure_sec") or 0
+        now = self.clock.now()
+        hours_passed = (now.hour * 3600 + now.minute * 60 + now.second - dep_sec) / 3600
         
-        if not schedule or not schedule.get("item_ids"):
-            return []
+        if hours_passed < 4:
+            return {"mode": "departure", "dep_time": _format_seconds(dep_sec), "debug_msg": f"Mode: Departure ({hours_passed:.2f}h passed)"}
+        else:
+            return {"mode": "return", "debug_msg": f"Mode: Return ({hours_passed:.2f}h passed)"}
+
+    def record_departure(self, child_id: int = DEFAULT_CHILD_ID):
+        """Records the current time as departure time and folds it into the rolling stats."""
+        today = self.clock.today()
+        today_str = today.isoformat()
+        today_day = day_number(today)
+        now_dt = self.clock.now()
+        now_sec = now_dt.hour * 3600 + now_dt.minute * 60 + now_dt.second
+        # Make sure the final ticks are on disk before the day is closed
+        self.check_writer.flush(child_id, today_day)
+        rules = self.get_time_restriction(child_id)
+        on_time = not rules["is_restricted"] or rules["start_time"] <= now_dt.time() <= rules["end_time"]
+        item_ids = self._day_item_ids(today_str, child_id)
+        checked = self.get_checked_items(child_id)
+        first_departure = False
+        with self.db.transaction() as cursor:
+            previous = self.db.upsert_history(cursor, today_day, STATUS_SUCCESS, now_sec, child_id)
+            # A second press on the same day must not count twice
+            if not previous or previous.get("status") != STATUS_SUCCESS:
+                self._update_departure_stats(cursor, child_id, today, now_dt)
+                self._update_achievements(cursor, child_id, today, on_time)
+                self.db.bump_item_stats(cursor, child_id, item_ids, checked)
+                first_departure = True
+        if first_departure:
+            self._bump_item_usage(item_ids, 1)
+        return _format_seconds(now_sec)
+
+    def _bump_item_usage(self, item_ids: List[int], amount: int):
+        # Only touch an index that is already built; a fresh build reads the counters anyway
+        with self._cache_lock:
+            if self._item_index is not None:
+                self._item_index.bump(item_ids, amount)
+
+    def _day_item_ids(self, date_str: str, child_id: int) -> List[int]:
+        """Resolved item IDs for the day, in display order."""
+        return [int(i) for i in self._resolve(date_str, child_id)["item_ids"].split(",") if i.strip().isdigit()]
+
+    def get_forgetfulness_ranking(self, child_id: int = DEFAULT_CHILD_ID, limit: int = 10) -> List[dict]:
+        """Items most often left unticked at departure, read straight from the running counters."""
+        ranking = []
+        for row in self.db.get_item_stats(child_id):
+            if not row["forgotten_count"]:
+                continue
+            row["forgotten_rate"] = row["forgotten_count"] / row["scheduled_count"] if row["scheduled_count"] else 0.0
+            ranking.append(row)
+        ranking.sort(key=lambda r: (-r["forgotten_count"], -r["forgotten_rate"], r["name"]))
+        return ranking[:limit]
+
+    def _update_achievements(self, cursor, child_id: int, today: date, on_time: bool):
+        """Scores the departure with the rule tables and bumps the running totals (one row)."""
+        today_str = today.isoformat()
+        today_day = day_number(today)
+        month_key = today_str[:7]
+        summary = self.db.load_achievement_summary(cursor, child_id) or {
+            "child_id": child_id, "total_points": 0, "current_streak": 0, "best_streak": 0,
+            "last_departure_day": None, "month_key": month_key, "month_departures": 0, "badges": "[]",
+        }
+
+        # Streaks only break on missed days that had something scheduled (however long the holiday);
+        # all() stops at the first scheduled day, so a long gap costs at most that many cached lookups
+        streak = 1
+        last = summary["last_departure_day"]
+        if last is not None and last < today_day:
+            if not any(self._is_scheduled_day(day_date(d).isoformat(), child_id) for d in range(last + 1, today_day)):
+                streak = summary["current_streak"] + 1
+
+        scheduled = self._scheduled_days_in_month(today.year, today.month, child_id)
+        month_departures = summary["month_departures"] if summary["month_key"] == month_key else 0
+        if today_str in scheduled:
+            month_departures += 1
+        month_complete = bool(scheduled) and today_str == scheduled[-1] and month_departures >= len(scheduled)
+
+        ctx = {"date": today_str, "month": month_key, "on_time": on_time,
+               "streak": streak, "month_complete": month_complete}
+        points, _ = achievements.score_departure(ctx)
+
+        prev_best = summary["best_streak"]
+        summary.update({
+            "total_points": summary["total_points"] + points,
+            "current_streak": streak,
+            "best_streak": max(summary["best_streak"], streak),
+            "last_departure_day": today_day,
+            "month_key": month_key,
+            "month_departures": month_departures,
+        })
+        badges = json.loads(summary["badges"] or "[]")
+        awarded = achievements.new_badges(summary, ctx, {b["key"] for b in badges})
+        summary["badges"] = json.dumps(badges + awarded, ensure_ascii=False)
+
+        # Keep what this departure earned on its history row so a reset can take it back
+        self.db.set_history_points(cursor, today_day, points, child_id,
+                                   badges_awarded=json.dumps([b["key"] for b in awarded]),
+                                   prev_best_streak=prev_best)
+        self.db.store_achievement_summary(cursor, summary)
+
+    def _is_scheduled_day(self, date_str: str, child_id: int = DEFAULT_CHILD_ID) -> bool:
+        """
+        A day counts for streaks and month completion when its own schedule or rule gives it items
+        or a time window, or its weekday defaults give it items. The household-wide profile applies
+        to every day, so its items and time window alone don't make a day scheduled.
+        """
+        schedule = self._get_schedule(date_str, child_id)
+        if schedule and (_has_items(schedule.get("item_ids")) or schedule.get("is_time_restricted")):
+            return True
+        layer = self._load_defaults()["weekdays"].get(str(date.fromisoformat(date_str).weekday()), {})
+        return _has_items(layer.get("item_ids"))
+
+    def _scheduled_days_in_month(self, year: int, month: int, child_id: int = DEFAULT_CHILD_ID) -> List[str]:
+        days = (date(year, month, d).isoformat() for d in range(1, calendar.monthrange(year, month)[1] + 1))
+        return [d_str for d_str in days if self._is_scheduled_day(d_str, child_id)]
+
+    def get_achievement_summary(self, child_id: int = DEFAULT_CHILD_ID) -> Dict[str, any]:
+        """Running totals for the achievements screen (single-row read)."""
+        summary = self.db.get_achievement_summary(child_id) or {}
+        return {
+            "total_points": summary.get("total_points", 0),
+            "current_streak": summary.get("current_streak", 0),
+            "best_streak": summary.get("best_streak", 0),
+            "badges": json.loads(summary.get("badges") or "[]"),
+        }
+
+    def _update_departure_stats(self, cursor, child_id: int, today: date, now_dt: datetime):
+        """
+        O(1): one row read, one sketch update, one row write.
+
+        The EWMA and the P² sketch cannot take a sample back out, so reset_today_history leaves
+        the stats alone; instead each day is fed at most once, and a press after a reset is skipped.
+        """
+        today_day = day_number(today)
+        row = self.db.load_departure_stats(cursor, child_id, today.weekday()) or {}
+        if row.get("last_day") == today_day:
+            return
+        stats = DepartureStats(row.get("count", 0), row.get("ewma_minutes"), row.get("sketch"))
+        stats.add(now_dt.hour * 60 + now_dt.minute + now_dt.second / 60)
+        self.db.store_departure_stats(cursor, child_id, today.weekday(), stats.count, stats.ewma,
+                                      stats.state_json(), today_day)
+
+    # --- Checklist ticks ---
+    def get_checked_items(self, child_id: int = DEFAULT_CHILD_ID) -> set:
+        """Today's ticked item IDs (pending writes first, then the cache, then the DB)."""
+        today_day = day_number(self.clock.today())
+        pending = self.check_writer.pending(child_id, today_day)
+        if pending is not None:
+            return set(pending)
+        key = (child_id, today_day)
+        with self._cache_lock:
+            cached = self._checks_cache.get(key)
+        if cached is None:
+            cached = frozenset(self.db.get_item_checks(child_id, today_day))
+            with self._cache_lock:
+                self._checks_cache[key] = cached
+        return set(cached)
+
+    def set_checked_items(self, child_id: int, checked_ids):
+        """Records the current tick set; the DB write is debounced."""
+        today_day = day_number(self.clock.today())
+        with self._cache_lock:
+            self._checks_cache[(child_id, today_day)] = frozenset(checked_ids)
+        self.check_writer.set(child_id, today_day, checked_ids)
+
+    def get_suggested_window(self, weekdays: List[int], child_id: int = DEFAULT_CHILD_ID,
+                             min_samples: int = 3) -> Optional[Dict[str, any]]:
+        """
+        Suggests a departure window from the rolling stats of the given weekdays.
+        The window spans the p10..p90 departure times, padded and snapped to 5 minutes.
+        Returns None until there are enough samples.
+        """
+        rows = self.db.get_departure_stats(child_id)
+        lows, highs, ewmas, samples = [], [], [], 0
+        for wd in set(weekdays):
+            row = rows.get(wd)
+            if not row or row["count"] < min_samples:
+                continue
+            stats = DepartureStats(row["count"], row["ewma_minutes"], row["sketch"])
+            lows.append(stats.low.value())
+            highs.append(stats.high.value())
+            ewmas.append(stats.ewma)
+            samples += stats.count
+        if not samples:
+            return None
+
+        start_min = max(0, int(min(lows) - 5) // 5 * 5)
+        end_min = min(23 * 60 + 55, -(-int(max(highs) + 5) // 5) * 5)
+        avg_min = int(round(sum(ewmas) / len(ewmas)))
+        return {
+            "start_time": time_of_minute(start_min),
+            "end_time": time_of_minute(end_min),
+            "typical_time": time_of_minute(avg_min),
+            "samples": samples,
+        }
+
+    def get_items_for_today(self, child_id: int = DEFAULT_CHILD_ID) -> List[dict]:
+        """Returns items for today (household base items + the day's own items)."""
+        today_str = self.clock.today().isoformat()
+        schedule = self._resolve(today_str, child_id)
 
         item_ids = []
         for i in schedule["item_ids"].split(","):
@@ -78,193 +683,229 @@ class LogicManager:
             placeholders = ",".join("?" * len(item_ids))
             cursor = conn.cursor()
             cursor.execute(f"SELECT * FROM items WHERE id IN ({placeholders})", item_ids)
-            return [dict(row) for row in cursor.fetchall()]
+            rows = {row["id"]: dict(row) for row in cursor.fetchall()}
+            return [rows[i] for i in item_ids if i in rows]
         except Exception as e:
             print(f"[ERROR] get_items_for_today: {e}")
             return []
         finally:
             conn.close()
 
-    def get_messages_for_today(self) -> Dict[str, str]:
+    def get_messages_for_today(self, child_id: int = DEFAULT_CHILD_ID) -> Dict[str, str]:
         """Returns departure and return messages."""
-        today_str = date.today().isoformat()
-        schedule = self.db.get_daily_schedule(today_str)
-        if schedule:
-            return {
-                "departure": schedule.get("departure_message", ""),
-                "return": schedule.get("return_message", "")
-            }
-        return {"departure": "", "return": ""}
+        today_str = self.clock.today().isoformat()
+        schedule = self._resolve(today_str, child_id)
+        return {
+            "departure": schedule.get("departure_message", ""),
+            "return": schedule.get("return_message", "")
+        }
 
-    def get_time_restriction(self) -> Dict[str, any]:
+    def get_time_restriction(self, child_id: int = DEFAULT_CHILD_ID) -> Dict[str, any]:
         """Returns time restriction settings."""
-        today_str = date.today().isoformat()
-        schedule = self.db.get_daily_schedule(today_str)
-        
-        is_restricted = False
-        start_time = datetime.strptime("07:50", "%H:%M").time()
-        end_time = datetime.strptime("08:10", "%H:%M").time()
-
-        if schedule:
-            is_restricted = str(schedule.get("is_time_restricted", "false")).lower() == "true"
-            try:
-                if schedule.get("start_time"):
-                    start_time = datetime.strptime(schedule["start_time"], "%H:%M").time()
-                if schedule.get("end_time"):
-                    end_time = datetime.strptime(schedule["end_time"], "%H:%M").time()
-            except ValueError:
-                pass
-
+        today_str = self.clock.today().isoformat()
+        schedule = self._resolve(today_str, child_id)
         return {
-            "is_restricted": is_restricted,
-            "start_time": start_time,
-            "end_time": end_time
+            "is_restricted": bool(schedule["is_time_restricted"]),
+            "start_time": time_of_minute(schedule["start_min"]),
+            "end_time": time_of_minute(schedule["end_min"])
         }
 
+    def get_departure_window(self, child_id: int = DEFAULT_CHILD_ID) -> Dict[str, any]:
+        """
+        Today's window relative to now, for a client-side countdown.
+        opens_in / closes_in are seconds from now (negative once passed); None when unrestricted.
+        """
+        rules = self.get_time_restriction(child_id)
+        now_dt = self.clock.now()
+        now_sec = now_dt.hour * 3600 + now_dt.minute * 60 + now_dt.second + now_dt.microsecond / 1e6
+        window = dict(rules, opens_in=None, closes_in=None)
+        if rules["is_restricted"]:
+            window["opens_in"] = minute_of_day(rules["start_time"]) * 60 - now_sec
+            window["closes_in"] = minute_of_day(rules["end_time"]) * 60 - now_sec
+        return window
+
+    def is_departure_open(self, child_id: int = DEFAULT_CHILD_ID) -> bool:
+        """Server-side check made when the departure button is pressed."""
+        rules = self.get_time_restriction(child_id)
+        return not rules["is_restricted"] or rules["start_time"] <= self.clock.now().time() <= rules["end_time"]
+
     def save_time_settings(self, is_restricted: bool, start_t, end_t):
-        """Global time settings helper (saves to today's schedule as well)."""
-        today_str = date.today().isoformat()
-        schedule = self.db.get_daily_schedule(today_str) or {}
-        
-        item_ids = schedule.get("item_ids", "")
-        dep_msg = schedule.get("departure_message", "")
-        ret_msg = schedule.get("return_message", "")
-        
-        val_restricted = "true" if is_restricted else "false"
-        val_start = start_t.strftime("%H:%M")
-        val_end = end_t.strftime("%H:%M")
-        
-        self.db.save_daily_schedule(today_str, item_ids, dep_msg, ret_msg, val_restricted, val_start, val_end)
+        """Global time settings helper (updates the household default time window)."""
+        profile = self._load_defaults()
+        layer = dict(profile["all"])
+        layer["is_time_restricted"] = int(bool(is_restricted))
+        layer["start_min"] = minute_of_day(start_t)
+        layer["end_min"] = minute_of_day(end_t)
+        profile["all"] = layer
+        self._store_defaults(profile)
 
-    def get_scheduled_dates(self, year: int, month: int) -> List[str]:
-        month_pattern = f"{year}-{month:02d}-%"
-        conn = self.db.get_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT date FROM daily_schedules WHERE date LIKE ?", (month_pattern,))
-            return [row[0] for row in cursor.fetchall()]
-        except Exception:
-            return []
-        finally:
-            conn.close()
+    def get_scheduled_dates(self, year: int, month: int, child_id: int = DEFAULT_CHILD_ID) -> List[str]:
+        return sorted(self._month_schedules(year, month, child_id).keys())
 
-    def get_schedule_details(self, date_str: str) -> Dict[str, any]:
-        schedule = self.db.get_daily_schedule(date_str)
-        data = {
-            "item_names": [],
-            "departure_message": "",
-            "return_message": "",
-            "is_restricted": False,
-            "start_time": datetime.strptime("07:50", "%H:%M").time(),
-            "end_time": datetime.strptime("08:10", "%H:%M").time()
+    def get_schedule_details(self, date_str: str, child_id: int = DEFAULT_CHILD_ID) -> Dict[str, any]:
+        """
+        Returns the day's own values for editing.
+        inherits_time is True when the day follows the household time window.
+        version is the row version to hand back on save (None when the day has no row yet).
+        Served from the month cache, so a prefetched month opens without a query.
+        """
+        # Override rows carry their own version; the cached month is dropped on every write
+        schedule = self._get_schedule(date_str, child_id) or {}
+        row = schedule if schedule.get("source") == "override" else None
+        effective = self._resolve(date_str, child_id)
+        return {
+            "version": row["version"] if row else None,
+            "item_names": self._item_names(schedule.get("item_ids")),
+            "departure_message": schedule.get("departure_message") or "",
+            "return_message": schedule.get("return_message") or "",
+            "inherits_time": schedule.get("is_time_restricted") is None,
+            "is_restricted": bool(effective["is_time_restricted"]),
+            "start_time": time_of_minute(effective["start_min"]),
+            "end_time": time_of_minute(effective["end_min"])
         }
-        if schedule:
-            data["departure_message"] = schedule.get("departure_message", "")
-            data["return_message"] = schedule.get("return_message", "")
-            data["is_restricted"] = str(schedule.get("is_time_restricted", "false")).lower() == "true"
-            try:
-                if schedule.get("start_time"):
-                    data["start_time"] = datetime.strptime(schedule["start_time"], "%H:%M").time()
-                if schedule.get("end_time"):
-                    data["end_time"] = datetime.strptime(schedule["end_time"], "%H:%M").time()
-            except ValueError:
-                pass
-
-            if schedule.get("item_ids"):
-                item_ids = [int(i) for i in schedule["item_ids"].split(",") if i.strip().isdigit()]
-                if item_ids:
-                    conn = self.db.get_connection()
-                    try:
-                        placeholders = ",".join("?" * len(item_ids))
-                        cursor = conn.cursor()
-                        cursor.execute(f"SELECT name FROM items WHERE id IN ({placeholders})", item_ids)
-                        data["item_names"] = [row[0] for row in cursor.fetchall()]
-                    finally:
-                        conn.close()
-        return data
 
     def save_schedule_from_ui(self, date_str: str, item_names: List[str], 
                             dep_msg: str, ret_msg: str,
-                            is_restricted: bool, start_time, end_time):
-        clean_names = [n.strip() for n in item_names if n.strip()]
-        item_ids = []
-        
-        conn = self.db.get_connection()
-        try:
-            cursor = conn.cursor()
-            for name in clean_names:
-                cursor.execute("SELECT id FROM items WHERE name = ?", (name,))
-                row = cursor.fetchone()
-                if row:
-                    item_ids.append(str(row[0]))
-                else:
-                    cursor.execute("INSERT INTO items (name, icon) VALUES (?, ?)", (name, "🎒"))
-                    item_ids.append(str(cursor.lastrowid))
-            conn.commit()
-        finally:
-            conn.close()
-        
-        item_ids_str = ",".join(item_ids)
-        val_restricted = "true" if is_restricted else "false"
-        val_start = start_time.strftime("%H:%M")
-        val_end = end_time.strftime("%H:%M")
-        self.db.save_daily_schedule(date_str, item_ids_str, dep_msg, ret_msg, val_restricted, val_start, val_end)
+                            is_restricted: bool, start_time, end_time,
+                            child_id: int = DEFAULT_CHILD_ID, expected_version=UNCHECKED) -> bool:
+        """
+        Saves one day. With expected_version (from get_schedule_details) the write is a
+        compare-and-swap: returns False and changes nothing if someone saved the day in between.
+        """
+        if expected_version is UNCHECKED:
+            self._save_schedules([date_str], item_names, dep_msg, ret_msg, is_restricted, start_time, end_time, child_id)
+            return True
+        clean_names = self._clean_item_names(item_names)
+        val_restricted, val_start, val_end = self._time_fields(is_restricted, start_time, end_time)
+        item_ids = self.db.save_schedule_if_version(day_number(date.fromisoformat(date_str)), expected_version,
+                                                    clean_names, dep_msg, ret_msg, val_restricted, val_start, val_end,
+                                                    child_id)
+        if item_ids is None:
+            return False
+        self._index_items(item_ids, clean_names)
+        self._invalidate_schedules([date_str], child_id)
+        return True
 
     def save_bulk_schedule_from_ui(self, date_list: List[str], item_names: List[str], 
                                  dep_msg: str, ret_msg: str,
-                                 is_restricted: bool, start_time, end_time):
-        clean_names = [n.strip() for n in item_names if n.strip()]
-        item_ids_str = ""
-        
-        conn = self.db.get_connection()
-        try:
-            cursor = conn.cursor()
-            ids = []
-            for name in clean_names:
-                cursor.execute("SELECT id FROM items WHERE name = ?", (name,))
-                row = cursor.fetchone()
-                if row:
-                    ids.append(str(row[0]))
-                else:
-                    cursor.execute("INSERT INTO items (name, icon) VALUES (?, ?)", (name, "🎒"))
-                    ids.append(str(cursor.lastrowid))
-            conn.commit()
-            item_ids_str = ",".join(ids)
-        finally:
-            conn.close()
+                                 is_restricted: bool, start_time, end_time,
+                                 child_id: int = DEFAULT_CHILD_ID):
+        self._save_schedules(date_list, item_names, dep_msg, ret_msg, is_restricted, start_time, end_time, child_id)
+
+    def _save_schedules(self, date_list: List[str], item_names: List[str],
+                        dep_msg: str, ret_msg: str,
+                        is_restricted: bool, start_time, end_time,
+                        child_id: int = DEFAULT_CHILD_ID):
+        """Shared save path: resolves item names and upserts every date in one commit."""
+        # Keep the input order but drop blanks and duplicates
+        clean_names = self._clean_item_names(item_names)
+        val_restricted, val_start, val_end = self._time_fields(is_restricted, start_time, end_time)
+        day_list = [day_number(date.fromisoformat(d)) for d in date_list]
+        item_ids = self.db.save_schedules_with_items(day_list, clean_names, dep_msg, ret_msg, val_restricted,
+                                                     val_start, val_end, child_id)
+        self._index_items(item_ids, clean_names)
+        self._invalidate_schedules(date_list, child_id)
+
+    @staticmethod
+    def _time_fields(is_restricted: Optional[bool], start_time, end_time) -> tuple:
+        """is_restricted=None stores NULLs so the date inherits the household time window."""
+        if is_restricted is None:
+            return None, None, None
+        return int(bool(is_restricted)), minute_of_day(start_time), minute_of_day(end_time)
+
+    def get_schedule_rules(self, child_id: int = DEFAULT_CHILD_ID) -> List[Dict[str, any]]:
+        """Returns recurring rules with readable weekday labels and item names for the admin UI."""
+        rules = self.db.get_schedule_rules(child_id=child_id)
+        for r in rules:
+            r["weekday_labels"] = [label for i, label in enumerate(WEEKDAY_LABELS) if r["weekday_mask"] & (1 << i)]
+            r["item_names"] = self._item_names(r.get("item_ids"))
+            r["start_date"] = day_date(r["start_day"]).isoformat()
+            r["end_date"] = day_date(r["end_day"]).isoformat() if r.get("end_day") is not None else ""
+            r["exceptions"] = ",".join(day_date(int(x)).isoformat() for x in (r.get("exceptions") or "").split(",") if x.strip())
+        return rules
+
+    def save_schedule_rule(self, weekdays: List[int], start_date: date, end_date: Optional[date],
+                           item_names: List[str], dep_msg: str, ret_msg: str,
+                           is_restricted: bool, start_time, end_time,
+                           exceptions: Optional[List[date]] = None,
+                           child_id: int = DEFAULT_CHILD_ID):
+        """Stores a recurring rule (weekdays use date.weekday() numbering)."""
+        weekday_mask = 0
+        for wd in weekdays:
+            weekday_mask |= 1 << wd
+        clean_names = self._clean_item_names(item_names)
+        exceptions_str = ",".join(str(day_number(d)) for d in sorted(exceptions or []))
+        val_restricted, val_start, val_end = self._time_fields(is_restricted, start_time, end_time)
+        item_ids = self.db.save_schedule_rule(
+            weekday_mask, day_number(start_date), day_number(end_date) if end_date else None,
+            exceptions_str, clean_names, dep_msg, ret_msg, val_restricted, val_start, val_end, child_id
+        )
+        self._index_items(item_ids, clean_names)
+        self._invalidate_schedules()
 
-        val_restricted = "true" if is_restricted else "false"
-        val_start = start_time.strftime("%H:%M")
-        val_end = end_time.strftime("%H:%M")
-        for d_str in date_list:
-            self.db.save_daily_schedule(d_str, item_ids_str, dep_msg, ret_msg, val_restricted, val_start, val_end)
+    def delete_schedule_rule(self, rule_id: int):
+        self.db.delete_schedule_rule(rule_id)
+        self._invalidate_schedules()
 
-    def get_monthly_history(self, year: int, month: int) -> Dict[int, Dict[str, any]]:
-        month_pattern = f"{year}-{month:02d}-%"
+    def get_monthly_history(self, year: int, month: int, child_id: int = DEFAULT_CHILD_ID) -> Dict[int, Dict[str, any]]:
+        first_day = day_number(date(year, month, 1))
         history_data = {}
-        conn = self.db.get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT date, status, departure_time FROM history WHERE date LIKE ?", (month_pattern,))
-            rows = cursor.fetchall()
+            rows = self.db.get_history_range(first_day, first_day + calendar.monthrange(year, month)[1] - 1, child_id)
             for row in rows:
-                d_str = row[0]
-                day_int = int(d_str.split("-")[2])
-                history_data[day_int] = {"status": row[1], "time": row[2]}
+                history_data[row["day"] - first_day + 1] = {
+                    "status": STATUS_NAMES.get(row["status"], ""), "time": _format_seconds(row["departure_sec"])
+                }
         except Exception:
             pass
-        finally:
-            conn.close()
         return history_data
 
-    def reset_today_history(self):
-        today_str = date.today().isoformat()
-        self.db.save_history(today_str, "morning", "")
-        # Actually delete to be sure
-        conn = self.db.get_connection()
+    def get_history_range(self, start: date, end: date, child_id: int = DEFAULT_CHILD_ID) -> Dict[str, Dict[str, any]]:
+        """Returns history keyed by ISO date for [start, end] using a single query."""
+        history_data = {}
         try:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM history WHERE date = ?", (today_str,))
-            conn.commit()
-        finally:
-            conn.close()
+            for row in self.db.get_history_range(day_number(start), day_number(end), child_id):
+                history_data[day_date(row["day"]).isoformat()] = {
+                    "status": STATUS_NAMES.get(row["status"], ""), "time": _format_seconds(row["departure_sec"])
+                }
+        except Exception as e:
+            print(f"[ERROR] get_history_range: {e}")
+        return history_data
+
+    def reset_today_history(self, child_id: int = DEFAULT_CHILD_ID):
+        """
+        Deletes today's record and rolls back what it added to the running totals.
+        Departure-time stats are not rolled back; the day stays counted once (see _update_departure_stats).
+        """
+        today_str = self.clock.today().isoformat()
+        today_day = day_number(self.clock.today())
+        scheduled_today = self._is_scheduled_day(today_str, child_id)
+        item_ids = self._day_item_ids(today_str, child_id)
+        checked = self.get_checked_items(child_id)
+        with self.db.transaction() as cursor:
+            deleted = self.db.delete_history_row(cursor, today_day, child_id)
+            if not deleted or deleted.get("status") != STATUS_SUCCESS:
+                return
+            self.db.bump_item_stats(cursor, child_id, item_ids, checked, sign=-1)
+            summary = self.db.load_achievement_summary(cursor, child_id)
+            if summary:
+                self._undo_achievements(cursor, summary, deleted, today_str, scheduled_today)
+                self.db.store_achievement_summary(cursor, summary)
+        # The in-memory index only changes once the rollback is committed
+        self._bump_item_usage(item_ids, -1)
+
+    def _undo_achievements(self, cursor, summary: dict, deleted: dict, today_str: str, scheduled_today: bool):
+        """Takes back the points, streak, best streak and badges the deleted departure earned."""
+        today_day = deleted["day"]
+        summary["total_points"] = max(0, summary["total_points"] - (deleted.get("points") or 0))
+        if summary["last_departure_day"] == today_day:
+            summary["current_streak"] = max(0, summary["current_streak"] - 1)
+            summary["last_departure_day"] = self.db.last_departure_before(cursor, today_day, summary["child_id"])
+        if summary["month_key"] == today_str[:7] and scheduled_today:
+            summary["month_departures"] = max(0, summary["month_departures"] - 1)
+        if deleted.get("prev_best_streak") is not None:
+            summary["best_streak"] = deleted["prev_best_streak"]
+        awarded = set(json.loads(deleted.get("badges_awarded") or "[]"))
+        if awarded:
+            badges = json.loads(summary["badges"] or "[]")
+            summary["badges"] = json.dumps([b for b in badges if b["key"] not in awarded], ensure_ascii=False)
@@ -0,0 +1,96 @@
+import json
+from typing import Optional
+
+
+class P2Quantile:
+    """
+    Streaming quantile estimate (Jain & Chlamtac P² algorithm).
+    Keeps five markers, so each add() is O(1) and the state fits in one small JSON blob.
+    """
+
+    def __init__(self, p: float, state: Optional[dict] = None):
+        self.p = p
+        if state:
+            self.q = state["q"]
+            self.n = state["n"]
+            self.np = state["np"]
+        else:
+            self.q = []
+            self.n = [0, 1, 2, 3, 4]
+            self.np = [0, 2 * p, 4 * p, 2 + 2 * p, 4]
+        self.dn = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def to_state(self) -> dict:
+        return {"q": self.q, "n": self.n, "np": self.np}
+
+    def add(self, x: float):
+        q, n = self.q, self.n
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = max(i for i in range(4) if q[i] <= x)
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.np[i] += self.dn[i]
+
+        for i in (1, 2, 3):
+            d = self.np[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                candidate = self._parabolic(i, d)
+                if q[i - 1] < candidate < q[i + 1]:
+                    q[i] = candidate
+                else:
+                    q[i] = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                n[i] += d
+
+    def _parabolic(self, i: int, d: int) -> float:
+        q, n = self.q, self.n
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self) -> Optional[float]:
+        if not self.q:
+            return None
+        if len(self.q) < 5:
+            return self.q[int(round(self.p * (len(self.q) - 1)))]
+        return self.q[2]
+
+
+class DepartureStats:
+    """
+    Rolling departure-time statistics for one child and weekday, in minutes since midnight.
+    EWMA tracks the recent typical time; two P² sketches track the early (p10) and late (p90) edges.
+    """
+    ALPHA = 0.2
+    LOW_Q = 0.1
+    HIGH_Q = 0.9
+
+    def __init__(self, count: int = 0, ewma: Optional[float] = None, state: Optional[str] = None):
+        sketches = json.loads(state) if state else {}
+        self.count = count
+        self.ewma = ewma
+        self.low = P2Quantile(self.LOW_Q, sketches.get("low"))
+        self.high = P2Quantile(self.HIGH_Q, sketches.get("high"))
+
+    def add(self, minutes: float):
+        self.count += 1
+        self.ewma = minutes if self.ewma is None else self.ALPHA * minutes + (1 - self.ALPHA) * self.ewma
+        self.low.add(minutes)
+        self.high.add(minutes)
+
+    def state_json(self) -> str:
+        return json.dumps({"low": self.low.to_state(), "high": self.high.to_state()})
@@ -0,0 +1,153 @@
+"""
+Accelerated day/year simulation against real SQLite databases.
+
+Replays N households x M days of reruns, schedule edits and departures with a
+SimulatedClock injected into LogicManager, then reports throughput and latency
+percentiles per operation.
+
+    python simulate.py --households 5 --days 365
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, date, timedelta, time as dtime
+
+from models.clock import SimulatedClock
+from models.db_manager import DatabaseManager
+from models.logic_manager import LogicManager
+
+ITEM_POOL = ["ランドセル", "ぼうし", "すいとう", "給食袋", "リコーダー", "体操服", "絵の具セット", "上ばき", "図書バッグ", "習字セット"]
+
+
+class Recorder:
+    """Collects per-operation latencies (seconds)."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    def call(self, op, fn, *args, **kwargs):
+        t0 = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.samples[op].append(time.perf_counter() - t0)
+        return result
+
+    @staticmethod
+    def _percentile(sorted_values, p):
+        if not sorted_values:
+            return 0.0
+        idx = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+        return sorted_values[idx]
+
+    def report(self, wall_seconds):
+        total = sum(len(v) for v in self.samples.values())
+        print(f"\n{total} ops in {wall_seconds:.2f}s  ({total / wall_seconds:,.0f} ops/s)\n")
+        print(f"{'operation':<26}{'count':>8}{'ops/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+        for op in sorted(self.samples):
+            values = sorted(self.samples[op])
+            busy = sum(values)
+            row = [self._percentile(values, p) * 1000 for p in (50, 95, 99)] + [values[-1] * 1000]
+            print(f"{op:<26}{len(values):>8}{len(values) / busy if busy else 0:>10,.0f}"
+                  + "".join(f"{v:>9.2f}" for v in row))
+
+
+def simulate_day(lm, clock, rec, rng, day, stats):
+    """One household day: evening edits, morning reruns, departure, afternoon return."""
+    weekday = day.weekday()
+
+    # Morning reruns before departure (ChildView.render does these on every rerun)
+    clock.set(datetime.combine(day, dtime(7, 0)))
+    for _ in range(rng.randint(5, 20)):
+        mode = rec.call("get_current_mode", lm.get_current_mode)["mode"]
+        if mode != "morning":
+            stats["unexpected_mode"] += 1
+        rec.call("get_items_for_today", lm.get_items_for_today)
+        rec.call("get_time_restriction", lm.get_time_restriction)
+        clock.advance(seconds=rng.randint(10, 90))
+
+    # Departure on school days, inside the window when one is set
+    if weekday < 5:
+        rules = lm.get_time_restriction()
+        if rules["is_restricted"]:
+            start = datetime.combine(day, rules["start_time"])
+            end = datetime.combine(day, rules["end_time"])
+            clock.set(start + (end - start) * rng.random())
+        else:
+            clock.set(datetime.combine(day, dtime(7, 45)) + timedelta(minutes=rng.randint(0, 30)))
+        rec.call("record_departure", lm.record_departure)
+        stats["departures"] += 1
+
+        clock.advance(minutes=30)
+        if rec.call("get_current_mode", lm.get_current_mode)["mode"] != "departure":
+            stats["unexpected_mode"] += 1
+        rec.call("get_messages_for_today", lm.get_messages_for_today)
+
+        clock.advance(hours=5)
+        if rec.call("get_current_mode", lm.get_current_mode)["mode"] != "return":
+            stats["unexpected_mode"] += 1
+        rec.call("get_messages_for_today", lm.get_messages_for_today)
+
+        # Occasional parent "undo" from the Danger Zone
+        if rng.random() < 0.02:
+            rec.call("reset_today_history", lm.reset_today_history)
+            if rec.call("get_current_mode", lm.get_current_mode)["mode"] != "morning":
+                stats["unexpected_mode"] += 1
+            rec.call("record_departure", lm.record_departure)
+
+    # Evening: parent plans the next few days
+    clock.set(datetime.combine(day, dtime(20, 0)))
+    if rng.random() < 0.6:
+        target = day + timedelta(days=1)
+        rec.call("get_schedule_details", lm.get_schedule_details, target.isoformat())
+        rec.call("save_schedule_from_ui", lm.save_schedule_from_ui,
+                 target.isoformat(), rng.sample(ITEM_POOL, rng.randint(2, 6)),
+                 "がんばってね！", "おかえり！", rng.random() < 0.5, dtime(7, 50), dtime(8, 10))
+    if weekday == 6:
+        week = [(day + timedelta(days=i)).isoformat() for i in range(1, 6)]
+        rec.call("save_bulk_schedule_from_ui", lm.save_bulk_schedule_from_ui,
+                 week, rng.sample(ITEM_POOL, 3), "", "", None, dtime(7, 50), dtime(8, 10))
+    rec.call("get_scheduled_dates", lm.get_scheduled_dates, day.year, day.month)
+    rec.call("get_monthly_history", lm.get_monthly_history, day.year, day.month)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--households", type=int, default=3)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2026, 4, 1))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db-dir", help="Keep the databases here instead of a temp dir")
+    args = parser.parse_args()
+
+    db_dir = args.db_dir or tempfile.mkdtemp(prefix="wasuremono_sim_")
+    os.makedirs(db_dir, exist_ok=True)
+    rng = random.Random(args.seed)
+    rec = Recorder()
+    stats = defaultdict(int)
+
+    households = []
+    for h in range(args.households):
+        clock = SimulatedClock(datetime.combine(args.start, dtime(6, 0)))
+        db = DatabaseManager(os.path.join(db_dir, f"household_{h}.db"))
+        households.append((LogicManager(db, clock=clock), clock))
+
+    t0 = time.perf_counter()
+    for offset in range(args.days):
+        day = args.start + timedelta(days=offset)
+        for lm, clock in households:
+            simulate_day(lm, clock, rec, rng, day, stats)
+    wall = time.perf_counter() - t0
+
+    print(f"Simulated {args.households} households x {args.days} days ({args.start} -> {day})")
+    print(f"departures={stats['departures']}  unexpected_mode={stats['unexpected_mode']}")
+    rec.report(wall)
+
+    if not args.db_dir:
+        shutil.rmtree(db_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 import streamlit as st
-import calendar
-from datetime import datetime
-from views.utils import inject_common_css, render_header, render_footer
+from datetime import date, timedelta
+from views.utils import inject_common_css, render_header, render_footer, render_child_selector
+from views.components import month_calendar
 
 class AchievementView:
     def __init__(self, logic_manager):
@@ -10,24 +10,39 @@ class AchievementView:
     def render(self):
         inject_common_css()
         render_header(show_clock=False)
+        self.child_id = render_child_selector(self.logic_manager, key="results_child_selector")
 
         # 0. 表示月のステート管理
         if "cal_year" not in st.session_state:
-            st.session_state.cal_year = datetime.now().year
+            st.session_state.cal_year = self.logic_manager.clock.now().year
         if "cal_month" not in st.session_state:
-            st.session_state.cal_month = datetime.now().month
+            st.session_state.cal_month = self.logic_manager.clock.now().month
+
+        if "cal_view_mode" not in st.session_state:
+            st.session_state.cal_view_mode = "月"
 
         year = st.session_state.cal_year
         month = st.session_state.cal_month
 
         st.markdown("---")
-        st.markdown(f'<h2 style="text-align:center;">🏆 {year}年{month}月の実績 🏆</h2>', unsafe_allow_html=True)
+        _, mode_col, _ = st.columns([1, 2, 1])
+        with mode_col:
+            st.radio("表示", ["月", "年"], key="cal_view_mode", horizontal=True, label_visibility="collapsed")
+        is_year_mode = st.session_state.cal_view_mode == "年"
+
+        if is_year_mode:
+            st.markdown(f'<h2 style="text-align:center;">🏆 {year}年の実績 🏆</h2>', unsafe_allow_html=True)
+        else:
+            st.markdown(f'<h2 style="text-align:center;">🏆 {year}年{month}月の実績 🏆</h2>', unsafe_allow_html=True)
         
         # 1. ナビゲーションボタン (前へ / 戻る / 次へ)
         nc1, nc2, nc3 = st.columns([1, 1, 1])
         with nc1:
-            if st.button("◀️ 前の月", key="btn_prev_month", use_container_width=True):
-                if st.session_state.cal_month == 1:
+            prev_label = "◀️ 前の年" if is_year_mode else "◀️ 前の月"
+            if st.button(prev_label, key="btn_prev_month", use_container_width=True):
+                if is_year_mode:
+                    st.session_state.cal_year -= 1
+                elif st.session_state.cal_month == 1:
                     st.session_state.cal_month = 12
                     st.session_state.cal_year -= 1
                 else:
@@ -42,45 +57,103 @@ class AchievementView:
 
         with nc3:
             if st.button("次へ ➡️", key="btn_next_month", use_container_width=True):
-                if st.session_state.cal_month == 12:
+                if is_year_mode:
+                    st.session_state.cal_year += 1
+                elif st.session_state.cal_month == 12:
                     st.session_state.cal_month = 1
                     st.session_state.cal_year += 1
                 else:
                     st.session_state.cal_month += 1
                 st.rerun()
 
+        self._render_summary_card()
         st.markdown("<br>", unsafe_allow_html=True)
+
+        if is_year_mode:
+            self._render_year_heatmap(year)
+            render_footer(show_buttons=False)
+            return
         
-        history = self.logic_manager.get_monthly_history(year, month)
-        
-        cal = calendar.Calendar(firstweekday=6)
-        month_days = cal.monthdayscalendar(year, month)
+        history = self.logic_manager.get_monthly_history(year, month, self.child_id)
         
-        cols_h = st.columns(7)
-        weekdays = ["Sun", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat"]
-        for i, d in enumerate(weekdays):
-            cols_h[i].markdown(f"<div style='text-align:center; font-weight:bold; color:white;'>{d}</div>", unsafe_allow_html=True)
-            
-        for week in month_days:
-            cols = st.columns(7)
-            for i, day in enumerate(week):
-                with cols[i]:
-                    if day != 0:
-                        self._render_cal_cell(day, history.get(day))
-                    else:
-                        st.markdown("<div style='height:80px;'></div>", unsafe_allow_html=True)
+        cells = {}
+        for day, data in history.items():
+            if data["status"] == "success":
+                cells[day] = {"marks": "💮", "sub": data["time"][:5]}
+        month_calendar(year, month, cells, mode="view", today=self.logic_manager.clock.today(),
+                       theme="achievement", key=f"results_cal_{self.child_id}_{year}_{month}")
         
         render_footer(show_buttons=False)
 
-    def _render_cal_cell(self, day, data):
-        bg = "rgba(255,255,255,0.9)"
-        content = f"<div>{day}</div>"
-        if data and data["status"] == "success":
-            content += "<div>💮</div>"
-            content += f"<div style='font-size:0.7rem;'>{data['time'][:5]}</div>"
-        
+    def _render_summary_card(self):
+        """ポイント・れんぞく記録・バッジ。集計テーブルを1行読むだけだっぴ。"""
+        summary = self.logic_manager.get_achievement_summary(self.child_id)
+        badges = "".join(
+            f"<span style='display:inline-block; background:#FFF8E1; border-radius:12px; padding:2px 10px; margin:3px; font-size:0.85rem;'>{b['label']}</span>"
+            for b in summary["badges"]
+        ) or "<span style='color:#999; font-size:0.85rem;'>まだバッジはないよ。出発してあつめよう！</span>"
+        st.markdown(f"""
+        <div style="background:rgba(255,255,255,0.9); border-radius:15px; padding:15px; margin-top:10px; text-align:center; box-shadow: 2px 2px 5px rgba(0,0,0,0.1);">
+            <div style="display:flex; justify-content:space-around; font-weight:bold;">
+                <div>⭐ {summary["total_points"]}<div style="font-size:0.7rem; color:#888;">ポイント</div></div>
+                <div>🔥 {summary["current_streak"]}日<div style="font-size:0.7rem; color:#888;">れんぞく</div></div>
+                <div>🏅 {summary["best_streak"]}日<div style="font-size:0.7rem; color:#888;">さいこう記録</div></div>
+            </div>
+            <div style="margin-top:10px;">{badges}</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    def _render_year_heatmap(self, year):
+        """1年分を1クエリ＋1つのSVGで描くっぴ（365個のウィジェットを作らない）。"""
+        start = date(year, 1, 1)
+        end = date(year, 12, 31)
+        history = self.logic_manager.get_history_range(start, end, self.child_id)
+
+        cell, gap = 12, 3
+        pitch = cell + gap
+        left, top = 30, 20
+        # カレンダーと同じく日曜始まりの週で列を作る
+        grid_start = start - timedelta(days=(start.weekday() + 1) % 7)
+        weeks = (end - grid_start).days // 7 + 1
+        width = left + weeks * pitch
+        height = top + 7 * pitch
+
+        today = self.logic_manager.clock.today()
+        parts = []
+        for i, label in ((1, "Mon"), (3, "Wed"), (5, "Fri")):
+            parts.append(f'<text x="0" y="{top + i * pitch + cell - 2}" font-size="9" fill="#888">{label}</text>')
+
+        success_count = 0
+        d = start
+        while d <= end:
+            col = (d - grid_start).days // 7
+            row = (d.weekday() + 1) % 7
+            x = left + col * pitch
+            y = top + row * pitch
+            if d.day == 1:
+                parts.append(f'<text x="{x}" y="{top - 6}" font-size="9" fill="#888">{d.month}月</text>')
+
+            data = history.get(d.isoformat())
+            if data and data["status"] == "success":
+                success_count += 1
+                fill = "#43A047"
+                tip = f"{d.isoformat()} 💮 {data['time'][:5]}"
+            elif d > today:
+                fill = "#F5F5F5"
+                tip = d.isoformat()
+            else:
+                fill = "#E0E0E0"
+                tip = d.isoformat()
+            parts.append(f'<rect x="{x}" y="{y}" width="{cell}" height="{cell}" rx="2" fill="{fill}"><title>{tip}</title></rect>')
+            d += timedelta(days=1)
+
+        svg = (
+            f'<svg viewBox="0 0 {width} {height}" width="100%" xmlns="http://www.w3.org/2000/svg" '
+            f'style="font-family:Helvetica, Arial, sans-serif;">{"".join(parts)}</svg>'
+        )
         st.markdown(f"""
-        <div style="background:{bg}; border-radius:15px; padding:5px; text-align:center; height:80px; margin-bottom:5px; box-shadow: 2px 2px 5px rgba(0,0,0,0.1);">
-            {content}
+        <div style="background:rgba(255,255,255,0.9); border-radius:15px; padding:15px; box-shadow: 2px 2px 5px rgba(0,0,0,0.1);">
+            {svg}
+            <div style="text-align:center; margin-top:10px; font-weight:bold; color:#2E7D32;">💮 {success_count}日 出発できたよ！</div>
         </div>
         """, unsafe_allow_html=True)
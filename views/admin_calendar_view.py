@@ -3,6 +3,7 @@ import calendar
 import time
 from datetime import datetime, date, timedelta
 from consts.messages import ERROR_MESSAGES
+from views.components import item_list_editor
 
 class AdminCalendarView:
     def __init__(self, logic_manager):
@@ -13,9 +14,9 @@ class AdminCalendarView:
         
         # --- State Management for Calendar ---
         if "admin_year" not in st.session_state:
-            st.session_state.admin_year = datetime.now().year
+            st.session_state.admin_year = self.logic_manager.clock.now().year
         if "admin_month" not in st.session_state:
-            st.session_state.admin_month = datetime.now().month
+            st.session_state.admin_month = self.logic_manager.clock.now().month
         
         # Bulk Mode State
         if "admin_bulk_mode" not in st.session_state:
@@ -152,7 +153,7 @@ class AdminCalendarView:
                     
                 if st.button("Save Time Rules"):
                     self.logic_manager.save_time_settings(is_restricted, start_t, end_t)
-                    st.success("Time rules updated for Today!")
+                    st.success("Household time rules updated!")
 
             st.markdown("<br>", unsafe_allow_html=True)
             with st.expander("⚠️ Danger Zone (緊急リセット)"):
@@ -176,35 +177,29 @@ class AdminCalendarView:
         
         # Pre-fill settings (from Today or default)
         
-        # --- Items Inputs ---
-        st.markdown("#### 🎒 Items to bring")
-        item_inputs = []
-        for i in range(10):
-            col_idx, col_input = st.columns([1, 9])
-            with col_idx:
-                st.write(f"{i+1}.")
-            with col_input:
-                val = st.text_input(f"Item {i+1}", key=f"bulk_item_{i}", placeholder="Item...")
-                if val.strip():
-                    item_inputs.append(val.strip())
-
-        st.markdown("<br>", unsafe_allow_html=True)
-
-        # --- Messages Inputs ---
-        dep_msg = st.text_area("🌅 Departure Message", key="bulk_dep_msg", placeholder="行ってらっしゃい！...")
-        ret_msg = st.text_area("🏠 Return Message", key="bulk_ret_msg", placeholder="おかえり！...")
-
         # --- Time Settings ---
         st.markdown("#### ⏱️ Time Rules")
         is_restricted = st.checkbox("Enable Time Limit", key="bulk_time_restricted")
+        defaults = self.logic_manager.get_defaults()
         col_start, col_end = st.columns(2)
         with col_start:
-            start_t = st.time_input("Start", key="bulk_start", disabled=not is_restricted, step=300, value=datetime.strptime("07:50", "%H:%M").time())
+            start_t = st.time_input("Start", key="bulk_start", disabled=not is_restricted, step=300, value=defaults["start_time"])
         with col_end:
-            end_t = st.time_input("End", key="bulk_end", disabled=not is_restricted, step=300, value=datetime.strptime("08:10", "%H:%M").time())
+            end_t = st.time_input("End", key="bulk_end", disabled=not is_restricted, step=300, value=defaults["end_time"])
 
-        st.markdown("<br>", unsafe_allow_html=True)
-        if st.button("🚀 Register All", type="primary", use_container_width=True):
+        # --- Items & Messages (submitted together as a form) ---
+        with st.form("bulk_edit_form", border=False):
+            st.markdown("#### 🎒 Items to bring")
+            item_inputs = item_list_editor([], key="bulk_items_editor")
+
+            st.markdown("<br>", unsafe_allow_html=True)
+            dep_msg = st.text_area("🌅 Departure Message", key="bulk_dep_msg", placeholder="行ってらっしゃい！...")
+            ret_msg = st.text_area("🏠 Return Message", key="bulk_ret_msg", placeholder="おかえり！...")
+
+            st.markdown("<br>", unsafe_allow_html=True)
+            submitted = st.form_submit_button("🚀 Register All", type="primary", use_container_width=True)
+
+        if submitted:
             date_list = list(st.session_state.admin_selected_dates)
             self.logic_manager.save_bulk_schedule_from_ui(
                 date_list, item_inputs, dep_msg, ret_msg,
@@ -231,11 +226,9 @@ class AdminCalendarView:
             st.session_state["dialog_data"] = data
             st.session_state["dialog_date"] = target_date_str
             
-            # Pre-fill session items for inputs
-            current_items = data["item_names"]
-            for i in range(10):
-                val = current_items[i] if i < len(current_items) else ""
-                st.session_state[f"input_item_{i}"] = val
+            # Pre-fill the item list (a new editor key rebuilds the table)
+            st.session_state["input_items"] = data["item_names"]
+            st.session_state["input_items_rev"] = st.session_state.get("input_items_rev", 0) + 1
             
             st.session_state["input_dep_msg"] = data["departure_message"]
             st.session_state["input_ret_msg"] = data["return_message"]
@@ -254,9 +247,8 @@ class AdminCalendarView:
             prev_items = prev_data["item_names"]
             
             # Update session state for Items/Messages only (Time settings are global-ish but handled per day)
-            for i in range(10):
-                val = prev_items[i] if i < len(prev_items) else ""
-                st.session_state[f"input_item_{i}"] = val
+            st.session_state["input_items"] = prev_items
+            st.session_state["input_items_rev"] = st.session_state.get("input_items_rev", 0) + 1
             
             st.session_state["input_dep_msg"] = prev_data["departure_message"]
             st.session_state["input_ret_msg"] = prev_data["return_message"]
@@ -271,28 +263,7 @@ class AdminCalendarView:
 
         st.markdown("---")
 
-        # --- Items Inputs ---
-        st.markdown("#### 🎒 Items to bring")
-        item_inputs = []
-        for i in range(10):
-            col_idx, col_input, col_icon = st.columns([1, 8, 1])
-            with col_idx:
-                st.markdown(f"<div style='text-align: right; padding-top: 10px; font-weight: bold; color: #aaa;'>{i+1}.</div>", unsafe_allow_html=True)
-            with col_input:
-                val = st.text_input(f"Item {i+1}", key=f"input_item_{i}", label_visibility="collapsed", placeholder="Input item name...")
-                if val.strip():
-                    item_inputs.append(val.strip())
-            with col_icon:
-                st.markdown("<div style='padding-top: 10px;'>➡️</div>", unsafe_allow_html=True)
-
-        st.markdown("<br>", unsafe_allow_html=True)
-
-        # --- Messages Inputs ---
-        dep_msg = st.text_area("🌅 Departure Message", key="input_dep_msg", placeholder="行ってらっしゃい！...", height=68)
-        ret_msg = st.text_area("🏠 Return Message", key="input_ret_msg", placeholder="おかえり！...", height=68)
-
         # --- Time Settings (Inside Dialog) ---
-        st.markdown("<br>", unsafe_allow_html=True)
         st.markdown("#### ⏱️ Time Rules")
         is_restricted = st.checkbox("行ってきますボタンを時間で制御する", key="input_time_restricted")
         
@@ -302,9 +273,22 @@ class AdminCalendarView:
         with col_end:
             end_t = st.time_input("End Time", key="input_end_time", disabled=not is_restricted, step=300)
 
-        # --- Save Button ---
+        # --- Items & Messages (submitted together as a form) ---
         st.markdown("<br>", unsafe_allow_html=True)
-        if st.button("✨ Work a spell with this content ✨", type="primary", use_container_width=True):
+        with st.form("edit_form", border=False):
+            st.markdown("#### 🎒 Items to bring")
+            item_inputs = item_list_editor(st.session_state["input_items"],
+                                           key=f"input_items_editor_{st.session_state['input_items_rev']}")
+
+            st.markdown("<br>", unsafe_allow_html=True)
+            dep_msg = st.text_area("🌅 Departure Message", key="input_dep_msg", placeholder="行ってらっしゃい！...", height=68)
+            ret_msg = st.text_area("🏠 Return Message", key="input_ret_msg", placeholder="おかえり！...", height=68)
+
+            # --- Save Button ---
+            st.markdown("<br>", unsafe_allow_html=True)
+            submitted = st.form_submit_button("✨ Work a spell with this content ✨", type="primary", use_container_width=True)
+
+        if submitted:
             self.logic_manager.save_schedule_from_ui(
                 target_date_str, item_inputs, dep_msg, ret_msg,
                 is_restricted, start_t, end_t
@@ -2,7 +2,10 @@ import streamlit as st
 import calendar
 import time
 from datetime import datetime, timedelta
-from views.utils import inject_common_css
+from models.logic_manager import WEEKDAY_LABELS
+from consts.messages import ERROR_MESSAGES
+from views.utils import inject_common_css, render_child_selector
+from views.components import month_calendar, calendar_render_ms, item_list_editor
 
 class AdminView:
     def __init__(self, logic_manager):
@@ -13,9 +16,9 @@ class AdminView:
         self._inject_admin_css()
         
         if "admin_year" not in st.session_state:
-            st.session_state.admin_year = datetime.now().year
+            st.session_state.admin_year = self.logic_manager.clock.now().year
         if "admin_month" not in st.session_state:
-            st.session_state.admin_month = datetime.now().month
+            st.session_state.admin_month = self.logic_manager.clock.now().month
         
         if "admin_bulk_mode" not in st.session_state:
             st.session_state.admin_bulk_mode = False
@@ -24,6 +27,7 @@ class AdminView:
 
         year = st.session_state.admin_year
         month = st.session_state.admin_month
+        self.child_id = render_child_selector(self.logic_manager, key="admin_child_selector")
 
         if not st.session_state.admin_bulk_mode and "admin_dialog_date" in st.session_state:
             self.edit_dialog(st.session_state["admin_dialog_date"])
@@ -76,7 +80,12 @@ class AdminView:
 
         st.markdown("<br>", unsafe_allow_html=True)
 
+        cal_key = f"admin_cal_{'select' if st.session_state.admin_bulk_mode else 'click'}_{self.child_id}_{year}_{month}"
         if st.session_state.admin_bulk_mode:
+            # カレンダーの選択はボタンより後に描くので、ウィジェットの値から先に写しておくっぴ
+            picked = st.session_state.get(cal_key)
+            if picked:
+                st.session_state.admin_selected_dates = set(picked["selected"])
             st.info("📅 日付を選択して、「一括登録」ボタンを押してください。")
             if st.session_state.admin_selected_dates:
                 if st.button(f"指定した {len(st.session_state.admin_selected_dates)} 日分を一括登録する", type="primary", use_container_width=True):
@@ -84,69 +93,49 @@ class AdminView:
                     st.rerun()
             st.markdown("<br>", unsafe_allow_html=True)
 
-        scheduled_dates = self.logic_manager.get_scheduled_dates(year, month)
-        cal = calendar.Calendar(firstweekday=6) 
-        month_days = cal.monthdayscalendar(year, month)
-        
-        cols = st.columns(7)
-        weekdays = ["Sun", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat"]
-        for i, day in enumerate(weekdays):
-            cols[i].markdown(f'<div class="weekday-header">{day}</div>', unsafe_allow_html=True)
-
-        for week in month_days:
-            cols = st.columns(7)
-            for i, day in enumerate(week):
-                with cols[i]:
-                    if day == 0:
-                        st.markdown('<div class="empty-day"></div>', unsafe_allow_html=True)
-                    else:
-                        current_date_str = f"{year}-{month:02d}-{day:02d}"
-                        is_scheduled = current_date_str in scheduled_dates
-                        
-                        if st.session_state.admin_bulk_mode:
-                            is_selected = current_date_str in st.session_state.admin_selected_dates
-                            label = f"{day}"
-                            if is_scheduled: label += "✨"
-                            
-                            def _on_check(iso_date=current_date_str):
-                                if iso_date in st.session_state.admin_selected_dates:
-                                    st.session_state.admin_selected_dates.discard(iso_date)
-                                else:
-                                    st.session_state.admin_selected_dates.add(iso_date)
-
-                            st.checkbox(label, value=is_selected, key=f"chk_{current_date_str}", on_change=_on_check, kwargs={"iso_date": current_date_str})
-                        else:
-                            label = f"{day}"
-                            if is_scheduled: label += " ✨"
-                            if st.button(label, key=f"day_{current_date_str}", use_container_width=True):
-                                st.session_state["admin_dialog_date"] = current_date_str
-                                # 以前のダイアログデータが残っているのを防ぐため、明示的にクリアするっぴ
-                                if "dialog_date" in st.session_state:
-                                    del st.session_state["dialog_date"]
-                                st.rerun()
+        scheduled_dates = set(self.logic_manager.get_scheduled_dates(year, month, self.child_id))
+        # 前後の月を裏で読んでおくと、月送りやダイアログがすぐ開くっぴ
+        self.logic_manager.prefetch_months(year, month, self.child_id)
+        filter_dates = self._render_item_filter(year, month)
+        cells = {}
+        for day in range(1, calendar.monthrange(year, month)[1] + 1):
+            current_date_str = f"{year}-{month:02d}-{day:02d}"
+            marks = ("✨" if current_date_str in scheduled_dates else "") + ("🔎" if current_date_str in filter_dates else "")
+            if marks:
+                cells[day] = {"marks": marks}
+
+        if st.session_state.admin_bulk_mode:
+            month_calendar(year, month, cells, mode="select", selected=st.session_state.admin_selected_dates,
+                           today=self.logic_manager.clock.today(), key=cal_key)
+        else:
+            picked = month_calendar(year, month, cells, mode="click", today=self.logic_manager.clock.today(), key=cal_key)
+            # コンポーネントの値は再実行しても残るので、新しいクリックだけ拾うっぴ
+            if picked and picked["seq"] != st.session_state.get("admin_cal_seq"):
+                st.session_state["admin_cal_seq"] = picked["seq"]
+                st.session_state["admin_dialog_date"] = picked["date"]
+                # 以前のダイアログデータが残っているのを防ぐため、明示的にクリアするっぴ
+                if "dialog_date" in st.session_state:
+                    del st.session_state["dialog_date"]
+                st.rerun()
 
         if not st.session_state.admin_bulk_mode:
             st.markdown("<br><hr>", unsafe_allow_html=True)
-            st.subheader("⚙️ Global Time Rules")
-            
-            with st.expander("Departure Time Limits", expanded=True):
-                current_settings = self.logic_manager.get_time_restriction()
-                is_restricted = st.checkbox("Limit the 'Let's Go' button timing", value=current_settings["is_restricted"])
-                col_start, col_end = st.columns(2)
-                with col_start:
-                    start_t = st.time_input("Start Time", value=current_settings["start_time"], disabled=not is_restricted, step=300)
-                with col_end:
-                    end_t = st.time_input("End Time", value=current_settings["end_time"], disabled=not is_restricted, step=300)
-                    
-                if st.button("Save Time Rules"):
-                    self.logic_manager.save_time_settings(is_restricted, start_t, end_t)
-                    st.success("Time rules updated for Today!")
+            self._render_children_overview()
+
+            st.markdown("<br>", unsafe_allow_html=True)
+            self._render_forgetfulness_section()
+
+            st.markdown("<br>", unsafe_allow_html=True)
+            self._render_rules_section()
+
+            st.markdown("<br>", unsafe_allow_html=True)
+            self._render_defaults_section()
 
             st.markdown("<br>", unsafe_allow_html=True)
             with st.expander("⚠️ Danger Zone (緊急リセット)"):
                 st.warning("本日の出発記録を取り消します。")
                 if st.button("本日の履歴をリセットする", type="primary"):
-                    self.logic_manager.reset_today_history()
+                    self.logic_manager.reset_today_history(self.child_id)
                     st.success("本日の履歴を削除しました。")
                     time.sleep(1)
                     st.rerun()
@@ -157,106 +146,308 @@ class AdminView:
             Tap the date to cast a spell on tomorrow. 🪄
         </div>
         """, unsafe_allow_html=True)
+        render_ms = calendar_render_ms(cal_key)
+        if render_ms is not None:
+            st.caption(f"📅 calendar browser render {render_ms:.1f} ms")
 
     @st.dialog("🔥 Batch Registration")
     def bulk_edit_dialog(self):
         st.subheader(f"Registering for {len(st.session_state.admin_selected_dates)} days")
-        st.markdown("#### 🎒 Items to bring")
-        item_inputs = []
-        for i in range(10):
-            col_idx, col_input = st.columns([1, 9])
-            with col_idx: st.write(f"{i+1}.")
-            with col_input:
-                val = st.text_input(f"Item {i+1}", key=f"bulk_item_{i}", placeholder="Item...")
-                if val.strip(): item_inputs.append(val.strip())
-
-        st.markdown("<br>", unsafe_allow_html=True)
-        dep_msg = st.text_area("🌅 Departure Message", key="bulk_dep_msg", placeholder="行ってらっしゃい！...")
-        ret_msg = st.text_area("🏠 Return Message", key="bulk_ret_msg", placeholder="おかえり！...")
 
         st.markdown("#### ⏱️ Time Rules")
-        is_restricted = st.checkbox("Enable Time Limit", key="bulk_time_restricted")
+        if "bulk_start" not in st.session_state:
+            defaults = self.logic_manager.get_defaults()
+            st.session_state["bulk_time_inherit"] = True
+            st.session_state["bulk_start"] = defaults["start_time"]
+            st.session_state["bulk_end"] = defaults["end_time"]
+        weekdays = [datetime.strptime(d, "%Y-%m-%d").weekday() for d in st.session_state.admin_selected_dates]
+        self._render_window_suggestion(weekdays, "bulk_time_inherit", "bulk_time_restricted", "bulk_start", "bulk_end")
+        inherit_time = st.checkbox("共通の時間ルールを使う", key="bulk_time_inherit")
+        is_restricted = st.checkbox("Enable Time Limit", key="bulk_time_restricted", disabled=inherit_time)
         col_start, col_end = st.columns(2)
         with col_start:
-            start_t = st.time_input("Start", key="bulk_start", disabled=not is_restricted, step=300, value=datetime.strptime("07:50", "%H:%M").time())
+            start_t = st.time_input("Start", key="bulk_start", disabled=inherit_time or not is_restricted, step=300)
         with col_end:
-            end_t = st.time_input("End", key="bulk_end", disabled=not is_restricted, step=300, value=datetime.strptime("08:10", "%H:%M").time())
+            end_t = st.time_input("End", key="bulk_end", disabled=inherit_time or not is_restricted, step=300)
 
-        st.markdown("<br>", unsafe_allow_html=True)
-        if st.button("🚀 Register All", type="primary", use_container_width=True):
+        # 持ち物とメッセージはフォームにまとめて、登録ボタンを押すまで再実行しないっぴ
+        with st.form("bulk_edit_form", border=False):
+            st.markdown("#### 🎒 Items to bring")
+            item_inputs = item_list_editor([], key="bulk_items_editor")
+
+            st.markdown("<br>", unsafe_allow_html=True)
+            dep_msg = st.text_area("🌅 Departure Message", key="bulk_dep_msg", placeholder="行ってらっしゃい！...")
+            ret_msg = st.text_area("🏠 Return Message", key="bulk_ret_msg", placeholder="おかえり！...")
+
+            st.markdown("<br>", unsafe_allow_html=True)
+            submitted = st.form_submit_button("🚀 Register All", type="primary", use_container_width=True)
+
+        if submitted and self._confirm_item_names(item_inputs, "bulk_items_confirmed"):
             date_list = list(st.session_state.admin_selected_dates)
-            self.logic_manager.save_bulk_schedule_from_ui(date_list, item_inputs, dep_msg, ret_msg, is_restricted, start_t, end_t)
+            self.logic_manager.save_bulk_schedule_from_ui(date_list, item_inputs, dep_msg, ret_msg,
+                                                          None if inherit_time else is_restricted, start_t, end_t,
+                                                          child_id=self.child_id)
             st.success("Batch registration complete!")
             st.session_state["show_bulk_dialog"] = False
             st.session_state.admin_selected_dates = set()
             st.session_state.admin_bulk_mode = False
             st.rerun()
 
+    def _confirm_item_names(self, item_inputs, confirmed_key):
+        """
+        保存の前に持ち物名を確かめるっぴ。
+        今ある持ち物の名前に近い新しい名前があれば一度だけ止めて候補を見せ、同じ内容でもう一度押されたら保存する。
+        表記ゆれで今ある持ち物にまとめた分は、保存するときにお知らせするっぴ。
+        """
+        check = self.logic_manager.check_item_names(item_inputs)
+        if check["similar"] and st.session_state.get(confirmed_key) != item_inputs:
+            st.session_state[confirmed_key] = item_inputs
+            lines = [f"「{name}」は新しい持ち物になるよ。もしかして: {'・'.join(candidates)}"
+                     for name, candidates in check["similar"]]
+            st.warning("  \n".join(lines + ["このままでよければ、もう一度押してね。"]))
+            return False
+        st.session_state.pop(confirmed_key, None)
+        for entered, existing in check["folded"]:
+            st.toast(f"「{entered}」は「{existing}」にまとめたよ", icon="🎒")
+        return True
+
+    def _fill_dialog_inputs(self, data):
+        """ダイアログの入力欄を data の内容で作り直すっぴ（持ち物の表はキーを変えて作り直す）。"""
+        st.session_state["input_items"] = data["item_names"]
+        st.session_state["input_items_rev"] = st.session_state.get("input_items_rev", 0) + 1
+        st.session_state["input_dep_msg"] = data["departure_message"]
+        st.session_state["input_ret_msg"] = data["return_message"]
+        st.session_state["input_time_inherit"] = data["inherits_time"]
+        st.session_state["input_time_restricted"] = data["is_restricted"]
+        st.session_state["input_start_time"] = data["start_time"]
+        st.session_state["input_end_time"] = data["end_time"]
+
     @st.dialog("🪄 Setting up the Magic")
     def edit_dialog(self, target_date_str):
         dt = datetime.strptime(target_date_str, "%Y-%m-%d")
         st.caption(f"Preparing for {dt.strftime('%B %d, %Y')}")
 
         if "dialog_data" not in st.session_state or st.session_state.get("dialog_date") != target_date_str:
-            data = self.logic_manager.get_schedule_details(target_date_str)
+            data = self.logic_manager.get_schedule_details(target_date_str, self.child_id)
             st.session_state["dialog_data"] = data
             st.session_state["dialog_date"] = target_date_str
-            current_items = data["item_names"]
-            for i in range(10):
-                st.session_state[f"input_item_{i}"] = current_items[i] if i < len(current_items) else ""
-            st.session_state["input_dep_msg"] = data["departure_message"]
-            st.session_state["input_ret_msg"] = data["return_message"]
-            st.session_state["input_time_restricted"] = data["is_restricted"]
-            st.session_state["input_start_time"] = data["start_time"]
-            st.session_state["input_end_time"] = data["end_time"]
+            st.session_state.pop("dialog_conflict", None)
+            self._fill_dialog_inputs(data)
 
         if st.button("Copy from Previous Day 📋"):
             prev_day = (dt - timedelta(days=1)).strftime("%Y-%m-%d")
-            prev_data = self.logic_manager.get_schedule_details(prev_day)
-            prev_items = prev_data["item_names"]
-            for i in range(10):
-                st.session_state[f"input_item_{i}"] = prev_items[i] if i < len(prev_items) else ""
-            st.session_state["input_dep_msg"] = prev_data["departure_message"]
-            st.session_state["input_ret_msg"] = prev_data["return_message"]
-            st.session_state["input_time_restricted"] = prev_data["is_restricted"]
-            st.session_state["input_start_time"] = prev_data["start_time"]
-            st.session_state["input_end_time"] = prev_data["end_time"]
+            self._fill_dialog_inputs(self.logic_manager.get_schedule_details(prev_day, self.child_id))
             st.toast(f"Copied data from {prev_day}!", icon="📋")
             st.rerun()
 
         st.markdown("---")
-        st.markdown("#### 🎒 Items to bring")
-        item_inputs = []
-        for i in range(10):
-            col_idx, col_input, _ = st.columns([1, 8, 1])
-            with col_idx: st.markdown(f"<div style='text-align: right; padding-top: 10px; font-weight: bold; color: #aaa;'>{i+1}.</div>", unsafe_allow_html=True)
-            with col_input:
-                val = st.text_input(f"Item {i+1}", key=f"input_item_{i}", label_visibility="collapsed")
-                if val.strip(): item_inputs.append(val.strip())
-
-        st.markdown("<br>", unsafe_allow_html=True)
-        dep_msg = st.text_area("🌅 Departure Message", key="input_dep_msg", height=68)
-        ret_msg = st.text_area("🏠 Return Message", key="input_ret_msg", height=68)
-
         st.markdown("#### ⏱️ Time Rules")
-        is_restricted = st.checkbox("行ってきますボタンを時間で制御する", key="input_time_restricted")
+        self._render_window_suggestion([dt.weekday()], "input_time_inherit", "input_time_restricted",
+                                       "input_start_time", "input_end_time")
+        inherit_time = st.checkbox("共通の時間ルールを使う", key="input_time_inherit")
+        is_restricted = st.checkbox("行ってきますボタンを時間で制御する", key="input_time_restricted", disabled=inherit_time)
         col_start, col_end = st.columns(2)
-        with col_start: start_t = st.time_input("Start Time", key="input_start_time", disabled=not is_restricted, step=300)
-        with col_end: end_t = st.time_input("End Time", key="input_end_time", disabled=not is_restricted, step=300)
+        with col_start: start_t = st.time_input("Start Time", key="input_start_time", disabled=inherit_time or not is_restricted, step=300)
+        with col_end: end_t = st.time_input("End Time", key="input_end_time", disabled=inherit_time or not is_restricted, step=300)
 
-        if st.button("✨ Work a spell with this content ✨", type="primary", use_container_width=True):
-            self.logic_manager.save_schedule_from_ui(target_date_str, item_inputs, dep_msg, ret_msg, is_restricted, start_t, end_t)
+        if st.session_state.get("dialog_conflict"):
+            st.error(ERROR_MESSAGES["ERR_005"])
+            if st.button("🔄 最新の内容を読み込む", use_container_width=True):
+                # 入力欄を保存済みの内容で作り直すっぴ
+                if "dialog_date" in st.session_state: del st.session_state["dialog_date"]
+                st.rerun()
+
+        # 持ち物とメッセージはフォームにまとめて、保存ボタンを押すまで再実行しないっぴ
+        with st.form("edit_form", border=False):
+            st.markdown("#### 🎒 Items to bring")
+            item_inputs = item_list_editor(st.session_state["input_items"],
+                                           key=f"input_items_editor_{st.session_state['input_items_rev']}")
+
+            st.markdown("<br>", unsafe_allow_html=True)
+            dep_msg = st.text_area("🌅 Departure Message", key="input_dep_msg", height=68)
+            ret_msg = st.text_area("🏠 Return Message", key="input_ret_msg", height=68)
+
+            submitted = st.form_submit_button("✨ Work a spell with this content ✨", type="primary", use_container_width=True,
+                                              disabled=st.session_state.get("dialog_conflict", False))
+
+        if submitted and self._confirm_item_names(item_inputs, "input_items_confirmed"):
+            saved = self.logic_manager.save_schedule_from_ui(target_date_str, item_inputs, dep_msg, ret_msg,
+                                                             None if inherit_time else is_restricted, start_t, end_t,
+                                                             child_id=self.child_id,
+                                                             expected_version=st.session_state["dialog_data"]["version"])
+            if not saved:
+                st.session_state["dialog_conflict"] = True
+                st.rerun()
             st.success("Saved perfectly!")
             if "admin_dialog_date" in st.session_state: del st.session_state["admin_dialog_date"]
             if "dialog_date" in st.session_state: del st.session_state["dialog_date"] # Force reload on next click
             st.rerun()
 
+    def _render_item_filter(self, year, month):
+        """持ち物を選ぶと、その月に必要な日と次に必要な日を教えてくれるっぴ。"""
+        names = self.logic_manager.get_item_names()
+        item_name = st.selectbox("🔎 持ち物でさがす", [None] + names, key="admin_item_filter",
+                                 format_func=lambda n: "（すべて）" if n is None else n)
+        if not item_name:
+            return set()
+        first = datetime(year, month, 1).date()
+        last = datetime(year, month, calendar.monthrange(year, month)[1]).date()
+        dates = self.logic_manager.get_dates_for_item(item_name, first, last, self.child_id)
+        next_date = self.logic_manager.next_date_for_item(item_name, self.child_id)
+        days = "・".join(str(int(d[-2:])) for d in dates) or "なし"
+        st.caption(f"{month}月に{item_name}がいる日: {days}　／　つぎは: {next_date or '予定なし'}")
+        return set(dates)
+
+    def _render_window_suggestion(self, weekdays, inherit_key, restricted_key, start_key, end_key):
+        """いつもの出発時刻（曜日ごとの統計）からおすすめの時間帯を出すっぴ。ウィジェット生成前に呼ぶこと。"""
+        suggestion = self.logic_manager.get_suggested_window(weekdays, self.child_id)
+        if not suggestion:
+            return
+        col_tip, col_apply = st.columns([3, 1])
+        with col_tip:
+            st.caption(
+                f"💡 おすすめ: {suggestion['start_time'].strftime('%H:%M')}〜{suggestion['end_time'].strftime('%H:%M')}"
+                f"（いつもは {suggestion['typical_time'].strftime('%H:%M')} ごろ出発・{suggestion['samples']}回分）"
+            )
+        with col_apply:
+            if st.button("使う", key=f"apply_suggestion_{start_key}"):
+                st.session_state[inherit_key] = False
+                st.session_state[restricted_key] = True
+                st.session_state[start_key] = suggestion["start_time"]
+                st.session_state[end_key] = suggestion["end_time"]
+                st.rerun()
+
+    def _render_children_overview(self):
+        """きょうだい全員の今日のようす（1クエリ）とプロフィール追加。"""
+        st.subheader("👨‍👩‍👧 Today's Overview")
+        mode_labels = {"morning": "🌅 準備中", "departure": "👋 出発済み", "return": "🏠 おかえり"}
+        for child in self.logic_manager.get_children_overview():
+            dep = f"（{child['dep_time'][:5]} 出発）" if child["dep_time"] else ""
+            st.markdown(f"{child['icon'] or ''} **{child['name']}** — {mode_labels[child['mode']]}{dep} ・ 🎒 {child['item_count']}こ")
+
+        with st.expander("➕ こどもを追加"):
+            with st.form("child_form", clear_on_submit=True):
+                name = st.text_input("なまえ")
+                icon = st.text_input("アイコン（絵文字）", value="🧒", max_chars=2)
+                if st.form_submit_button("追加する", use_container_width=True) and name.strip():
+                    st.session_state.child_id = self.logic_manager.add_child(name, icon or "🧒")
+                    st.rerun()
+
+    def _render_forgetfulness_section(self):
+        """出発時にチェックされていなかった回数が多い持ち物ランキング。"""
+        st.subheader("🧐 忘れ物ランキング")
+        ranking = self.logic_manager.get_forgetfulness_ranking(self.child_id)
+        if not ranking:
+            st.caption("まだ忘れ物の記録はないっぴ！")
+            return
+        for rank, row in enumerate(ranking, start=1):
+            st.markdown(
+                f"{rank}. {row['icon'] or ''} **{row['name']}** — "
+                f"{row['forgotten_count']}回 / {row['scheduled_count']}回中（{row['forgotten_rate']:.0%}）"
+            )
+
+    def _render_rules_section(self):
+        """毎週の予定（繰り返しルール）。日付ごとの登録はカレンダー側が優先されるっぴ。"""
+        st.subheader("🔁 Weekly Rules")
+        rules = self.logic_manager.get_schedule_rules(self.child_id)
+        if not rules:
+            st.caption("まだ繰り返しルールはありません。")
+        for rule in rules:
+            col_desc, col_del = st.columns([5, 1])
+            with col_desc:
+                period = f"{rule['start_date']}〜{rule.get('end_date') or ''}"
+                items = "、".join(rule["item_names"]) or "（持ち物なし）"
+                st.markdown(f"**毎週{'・'.join(rule['weekday_labels'])}** {period}  \n🎒 {items}")
+                if rule.get("exceptions"):
+                    st.caption(f"除外: {rule['exceptions'].replace(',', ', ')}")
+            with col_del:
+                if st.button("🗑️", key=f"del_rule_{rule['id']}"):
+                    self.logic_manager.delete_schedule_rule(rule["id"])
+                    st.rerun()
+
+        # 入力欄は保存できたときだけ空にするっぴ（キーの版を上げて作り直す）。エラーのときは残す
+        rev = st.session_state.get("rule_form_rev", 0)
+        with st.expander("➕ 繰り返しルールを追加"):
+            with st.form("rule_form"):
+                weekdays = st.multiselect("曜日", options=list(range(7)), format_func=lambda i: WEEKDAY_LABELS[i],
+                                          key=f"rule_weekdays_{rev}")
+                col_from, col_to = st.columns(2)
+                with col_from:
+                    start_d = st.date_input("開始日", value=self.logic_manager.clock.now().date(), key=f"rule_start_{rev}")
+                with col_to:
+                    end_d = st.date_input("終了日", value=None, key=f"rule_end_{rev}")
+                items_text = st.text_input("持ち物（「、」区切り）", placeholder="リコーダー、給食袋", key=f"rule_items_{rev}")
+                exceptions_text = st.text_input("除外する日（YYYY-MM-DD を「,」区切り）", placeholder="2026-12-24, 2026-12-25",
+                                                key=f"rule_exceptions_{rev}")
+                dep_msg = st.text_input("🌅 Departure Message", key=f"rule_dep_msg_{rev}")
+                ret_msg = st.text_input("🏠 Return Message", key=f"rule_ret_msg_{rev}")
+                defaults = self.logic_manager.get_defaults()
+                inherit_time = st.checkbox("共通の時間ルールを使う", value=True, key=f"rule_time_inherit_{rev}")
+                is_restricted = st.checkbox("行ってきますボタンを時間で制御する", key=f"rule_time_restricted_{rev}")
+                col_start, col_end = st.columns(2)
+                with col_start:
+                    start_t = st.time_input("Start Time", value=defaults["start_time"], step=300, key=f"rule_start_time_{rev}")
+                with col_end:
+                    end_t = st.time_input("End Time", value=defaults["end_time"], step=300, key=f"rule_end_time_{rev}")
+
+                if st.form_submit_button("🔁 ルールを保存", type="primary", use_container_width=True):
+                    try:
+                        exceptions = [datetime.strptime(x.strip(), "%Y-%m-%d").date()
+                                      for x in exceptions_text.split(",") if x.strip()]
+                    except ValueError:
+                        st.error("除外する日は YYYY-MM-DD の形式で入力してね。")
+                        return
+                    if not weekdays:
+                        st.error("曜日を1つ以上選んでね。")
+                        return
+                    if end_d is not None and end_d < start_d:
+                        st.error("終了日は開始日より後の日にしてね。")
+                        return
+                    item_names = items_text.replace("，", "、").replace(",", "、").split("、")
+                    self.logic_manager.save_schedule_rule(weekdays, start_d, end_d, item_names, dep_msg, ret_msg,
+                                                          None if inherit_time else is_restricted, start_t, end_t,
+                                                          exceptions, child_id=self.child_id)
+                    st.session_state["rule_form_rev"] = rev + 1
+                    st.rerun()
+
+    def _render_defaults_section(self):
+        """家庭の共通設定。日付ごとの設定が空の項目はここから引き継ぐっぴ。"""
+        st.subheader("⚙️ Household Defaults")
+        with st.expander("Default Time Rules / Messages / Items", expanded=True):
+            scope_options = [None] + list(range(7))
+            scope = st.selectbox("対象", scope_options, key="defaults_scope",
+                                 format_func=lambda i: "全曜日" if i is None else f"{WEEKDAY_LABELS[i]}曜日")
+            current = self.logic_manager.get_defaults(scope)
+            if scope is not None and not current["has_override"]:
+                st.caption("この曜日は「全曜日」の設定を使っています。保存するとこの曜日だけの設定になります。")
+
+            suffix = "all" if scope is None else str(scope)
+            is_restricted = st.checkbox("Limit the 'Let's Go' button timing", value=current["is_restricted"], key=f"def_restricted_{suffix}")
+            col_start, col_end = st.columns(2)
+            with col_start:
+                start_t = st.time_input("Start Time", value=current["start_time"], disabled=not is_restricted, step=300, key=f"def_start_{suffix}")
+            with col_end:
+                end_t = st.time_input("End Time", value=current["end_time"], disabled=not is_restricted, step=300, key=f"def_end_{suffix}")
+            base_items = st.text_input("いつもの持ち物（「、」区切り）", value="、".join(current["item_names"]), key=f"def_items_{suffix}")
+            dep_msg = st.text_input("🌅 Departure Message", value=current["departure_message"], key=f"def_dep_{suffix}")
+            ret_msg = st.text_input("🏠 Return Message", value=current["return_message"], key=f"def_ret_{suffix}")
+
+            col_save, col_clear = st.columns(2)
+            with col_save:
+                if st.button("Save Defaults", type="primary", use_container_width=True):
+                    item_names = base_items.replace("，", "、").replace(",", "、").split("、")
+                    self.logic_manager.save_defaults(scope, is_restricted, start_t, end_t, dep_msg, ret_msg, item_names)
+                    st.success("Defaults updated! 今日以降のすべての日に反映されます。")
+            with col_clear:
+                if scope is not None and current["has_override"]:
+                    if st.button("曜日の設定を解除", use_container_width=True):
+                        self.logic_manager.clear_weekday_defaults(scope)
+                        st.rerun()
+
     def _inject_admin_css(self):
         st.markdown("""
         <style>
         .admin-header-title { font-size: 2rem; font-weight: bold; text-align: center; color: #333; }
-        .weekday-header { text-align: center; font-weight: bold; color: #888; margin-bottom: 5px; }
-        .empty-day { height: 50px; }
         .admin-footer-banner { background-color: #E0F2F2; color: #00695C; padding: 15px; border-radius: 15px; text-align: center; font-weight: bold; }
         div[data-testid="stColumn"] button { height: 60px; border-radius: 10px; background-color: white; color: #333; }
         </style>
@@ -1,8 +1,9 @@
 import streamlit as st
 import time
 import random
-from datetime import datetime
-from views.utils import inject_common_css, render_header, render_footer
+from views.utils import inject_common_css, render_header, render_footer, render_child_selector
+from views.components import item_checklist, departure_button, day_watch, celebration
+from consts.messages import ERROR_MESSAGES
 
 class ChildView:
     def __init__(self, logic_manager):
@@ -11,15 +12,16 @@ class ChildView:
     def render(self):
         inject_common_css()
         render_header()
+        self.child_id = render_child_selector(self.logic_manager)
         
-        # 0. 環境監視 (日付変更の検知)
-        self._render_env_monitor()
+        # 0. 日付変更の検知（プロセス共通の日付エポックと比べるだけ）
+        self._sync_day_epoch()
 
         if "debug_logs" not in st.session_state:
             st.session_state.debug_logs = []
 
         # 1. Get Mode
-        mode_info = self.logic_manager.get_current_mode()
+        mode_info = self.logic_manager.get_current_mode(self.child_id)
         mode = mode_info["mode"]
 
         # 2. Celebration (Always at top for visibility)
@@ -53,74 +55,73 @@ class ChildView:
             render_footer()
 
     def _render_morning_mode(self):
-        items = self.logic_manager.get_items_for_today()
-        
+        # 全体の再実行のときだけ持ち物を引き直して、その日のスナップショットとして持っておくっぴ
+        st.session_state.morning_snapshot = {
+            "scope": (self.child_id, self.logic_manager.clock.today().isoformat()),
+            "items": self.logic_manager.get_items_for_today(self.child_id),
+        }
+        self._render_morning_panel()
+        render_footer()
+
+    @st.fragment
+    def _render_morning_panel(self):
+        """持ち物チェックと出発ボタン。チェックが送られてきてもこの中だけが再実行されるっぴ。"""
+        started = time.perf_counter()
+        child_id = st.session_state.child_id
+        checked_scope = (child_id, self.logic_manager.clock.today().isoformat())
+        snapshot = st.session_state.get("morning_snapshot")
+        if not snapshot or snapshot["scope"] != checked_scope:
+            # 日付や子どもが変わっていたら全体を描き直すっぴ
+            st.rerun()
+        items = snapshot["items"]
+
         if not items:
             st.warning("📭 本日の持ち物設定はありません")
             # 持ち物がなくてもボタンは表示するっぴ！
             st.markdown("<br>", unsafe_allow_html=True)
             self._render_departure_button_logic(ignore_time_restriction=True)
-            render_footer()
             return
         
-        if 'checked_items' not in st.session_state:
-            st.session_state.checked_items = set()
+        # チェック状態は保存済みの値から復元（リロード・別端末・日付またぎでも消えない）
+        if 'checked_items' not in st.session_state or st.session_state.get("checked_scope") != checked_scope:
+            st.session_state.checked_items = self.logic_manager.get_checked_items(child_id)
+            st.session_state.checked_scope = checked_scope
 
         st.markdown("<div style='margin-top:20px;'></div>", unsafe_allow_html=True)
-        cols = st.columns(2)
-        
-        for i, item in enumerate(items):
-            item_id = item["id"]
-            is_checked = item_id in st.session_state.checked_items
-            
-            with cols[i % 2]:
-                st.markdown('<div class="item-btn-marker"></div>', unsafe_allow_html=True)
-                label = f"{item['name']}"
-                btn_type = "primary" if is_checked else "secondary"
-                
-                if st.button(label, key=f"btn_item_{item_id}", type=btn_type, use_container_width=True):
-                    if is_checked:
-                        st.session_state.checked_items.discard(item_id)
-                    else:
-                        st.session_state.checked_items.add(item_id)
-                    st.rerun()
+        synced = item_checklist(items, st.session_state.checked_items, key=f"checklist_{child_id}_{checked_scope[1]}")
+        # ブラウザがまとめて送ってきたときだけ保存するっぴ（同じ値で再実行されても書かない）
+        if synced and synced["seq"] != st.session_state.get("checklist_seq"):
+            st.session_state.checklist_seq = synced["seq"]
+            st.session_state.checked_items = set(synced["checked"])
+            self.logic_manager.set_checked_items(child_id, st.session_state.checked_items)
+            st.session_state.debug_logs.append(f"Checklist synced in {(time.perf_counter() - started) * 1000:.1f} ms")
 
         st.markdown("<br>", unsafe_allow_html=True)
         self._render_departure_button_logic()
-        render_footer()
 
-    @st.fragment(run_every="10s")
     def _render_departure_button_logic(self, ignore_time_restriction=False):
-        time_rules = self.logic_manager.get_time_restriction()
-        is_disabled = False
-        warning_msg = ""
-        now_t = datetime.now().time()
-
-        if time_rules["is_restricted"] and not ignore_time_restriction:
-            if not (time_rules["start_time"] <= now_t <= time_rules["end_time"]):
-                is_disabled = True
-                warning_msg = f"現在は出発できません。{time_rules['start_time'].strftime('%H:%M')}〜{time_rules['end_time'].strftime('%H:%M')}の間だけボタンが押せます。"
-        
-        # 10秒ごとに自動更新していることを示すインジケーター（開発用/ユーザー安心用）
-        st.markdown(f"<div style='text-align:right; font-size:0.7rem; color:#ccc;'>Last Update: {now_t.strftime('%H:%M:%S')}</div>", unsafe_allow_html=True)
-
-        _, col, _ = st.columns([1, 2, 1])
-        with col:
-            if is_disabled:
-                 st.button("🕐 待機中...", key="btn_main_go", disabled=True, use_container_width=True)
-                 if warning_msg:
-                     st.markdown(f"<div style='text-align:center; color:red; font-size:0.8rem;'>{warning_msg}</div>", unsafe_allow_html=True)
-            else:
-                if st.button("🚀 行ってきます！", key="btn_main_go", type="primary", use_container_width=True):
-                    st.session_state.debug_logs.append("Button Clicked!")
-                    self.logic_manager.record_departure()
-                    st.session_state.just_departed = True
-                    st.session_state.trigger_balloon = True
-                    st.session_state.debug_logs.append("DB Saved & Rerunning...")
-                    st.rerun()
+        child_id = st.session_state.child_id
+        # 時間の窓は描画のときに一度だけ渡し、有効/無効とカウントダウンはブラウザが進めるっぴ
+        window = self.logic_manager.get_departure_window(child_id)
+        if ignore_time_restriction:
+            window = dict(window, opens_in=None, closes_in=None)
+        pressed = departure_button(window, key=f"departure_{child_id}_{self.logic_manager.clock.today().isoformat()}")
+        if not pressed or pressed["seq"] == st.session_state.get("departure_seq"):
+            return
+        st.session_state.departure_seq = pressed["seq"]
+        st.session_state.debug_logs.append("Button Clicked!")
+        # 押されたときだけサーバーの時計で窓を確かめるっぴ
+        if not ignore_time_restriction and not self.logic_manager.is_departure_open(child_id):
+            st.error(ERROR_MESSAGES["ERR_102"])
+            return
+        self.logic_manager.record_departure(child_id)
+        st.session_state.just_departed = True
+        st.session_state.trigger_balloon = True
+        st.session_state.debug_logs.append("DB Saved & Rerunning...")
+        st.rerun()
 
     def _render_departure_mode(self, dep_time):
-        messages = self.logic_manager.get_messages_for_today()
+        messages = self.logic_manager.get_messages_for_today(self.child_id)
         msg = messages.get("departure") or "気をつけていってらっしゃい！"
         
         st.markdown(f"""
@@ -134,7 +135,7 @@ class ChildView:
             st.markdown(f"<div style='text-align:center; color:#555;'>出発時刻: {dep_time[:5]}</div>", unsafe_allow_html=True)
 
     def _render_return_mode(self):
-        messages = self.logic_manager.get_messages_for_today()
+        messages = self.logic_manager.get_messages_for_today(self.child_id)
         msg = messages.get("return") or "おかえりなさい！"
         
         st.markdown(f"""
@@ -144,19 +145,16 @@ class ChildView:
         </div>
         """, unsafe_allow_html=True)
 
-    @st.fragment(run_every="60s")
-    def _render_env_monitor(self):
-        """日付が変わったことを検知して画面をリロードするっぴ！"""
-        current_date = datetime.now().strftime("%Y-%m-%d")
-        if "view_date" not in st.session_state:
-            st.session_state.view_date = current_date
-            
-        if current_date != st.session_state.view_date:
-            st.session_state.view_date = current_date
-            # 日付が変わったので、チェック状態などをリセットしてリロード
-            if "checked_items" in st.session_state:
-                st.session_state.checked_items = set()
-            st.rerun()
+    def _sync_day_epoch(self):
+        """日付が変わっていたら、チェック状態とスナップショットを捨てて今日の分を読み直すっぴ！"""
+        epoch = self.logic_manager.day_epoch.current()
+        if st.session_state.get("day_epoch") not in (None, epoch):
+            st.session_state.checked_items = set()
+            st.session_state.pop("checked_scope", None)
+            st.session_state.pop("morning_snapshot", None)
+        st.session_state.day_epoch = epoch
+        # 次の0時に一度だけブラウザから起こしてもらう（それまでサーバーには何も来ない）
+        day_watch(self.logic_manager.day_epoch, key=f"day_watch_{epoch}")
 
     def _trigger_celebration(self):
         """高度なエフェクトエンジンを実行するっぴ！"""
@@ -182,118 +180,5 @@ class ChildView:
         icon, msg, anim_type = random.choice(patterns)
         st.toast(msg, icon=icon)
 
-        import streamlit.components.v1 as components
-        
-        # エフェクトエンジン本体（JS + CSS）
-        js_template = """
-        <div id="effect-engine-root" style="width:100vw; height:100vh; overflow:hidden; background:transparent;"></div>
-        <style>
-            body, html { margin:0; padding:0; background:transparent !important; overflow:hidden; width:100vw; height:100vh; }
-        </style>
-        <script>
-        (function() {
-            // --- 1. iframe物理的拡張ロジック ---
-            const frame = window.frameElement;
-            if (frame) {
-                const style = frame.style;
-                style.position = 'fixed';
-                style.top = '0';
-                style.left = '0';
-                style.width = '100vw';
-                style.height = '100vh';
-                style.maxHeight = '100vh';
-                style.maxWidth = '100vw';
-                style.zIndex = '9999999';
-                style.pointerEvents = 'none';
-                style.border = 'none';
-                
-                // 親のクリッピング（overflow:hidden）を連鎖的に解除するっぴ
-                let p = frame.parentElement;
-                while (p && p.tagName !== 'BODY') {
-                    p.style.overflow = 'visible';
-                    p = p.parentElement;
-                }
-            }
-
-            // --- 2. 動きのロジック変数（Effect Logics） ---
-            const icon = "__ICON__";
-            const type = "__TYPE__";
-            const count = 35;
-            const root = document.getElementById('effect-engine-root');
-
-            const MovementLogics = {
-                rising: (i) => ({ startX: Math.random()*100, startY: 110, endX: (Math.random()*20-10), endY: -110 }),
-                falling: (i) => ({ startX: Math.random()*100, startY: -10, endX: (Math.random()*20-10), endY: 110 }),
-                rain: (i) => ({ startX: Math.random()*100, startY: -10, endX: (Math.random()*10-5), endY: 110 }),
-                explosion: (i) => {
-                    const angle = Math.random() * Math.PI * 2;
-                    const dist = Math.random() * 80 + 20;
-                    return { startX: 50, startY: 50, endX: Math.cos(angle)*dist, endY: Math.sin(angle)*dist, relative: true };
-                },
-                firework: (i) => {
-                    const angle = Math.random() * Math.PI * 2;
-                    const dist = Math.random() * 70 + 30;
-                    return { startX: 50, startY: 50, endX: Math.cos(angle)*dist, endY: Math.sin(angle)*dist, relative: true };
-                },
-                launch: (i) => ({ startX: 40 + Math.random()*20, startY: 110, endX: 0, endY: -150, relative: true, duration: '1s', ease: 'ease-in' }),
-                waddle: (i) => ({ startX: -10, startY: 85 + (i%3)*5, endX: 120, endY: 0, relative: true, duration: '5s', ease: 'linear' }),
-                parade: (i) => ({ startX: 110, startY: 85 + (i%3)*5, endX: -120, endY: 0, relative: true, duration: '5s', ease: 'linear' }),
-                zoom: (i) => ({ startX: 50, startY: 50, type: 'scale', duration: '1.5s' }),
-                arc: (i) => ({ startX: -10, startY: 80, endX: 120, endY: 0, relative: true, duration: '3s', ease: 'cubic-bezier(0.25, 1, 0.5, 1)' }),
-                spiral: (i) => {
-                    const a = i * 0.4; const r = i * 3.5;
-                    return { startX: 50, startY: 50, endX: Math.cos(a)*r, endY: Math.sin(a)*r, relative: true };
-                },
-                pop: (i) => ({ startX: Math.random()*100, startY: Math.random()*100, type: 'pop' }),
-                bloom: (i) => ({ startX: Math.random()*100, startY: Math.random()*100, type: 'pop', duration: '2s' }),
-                wave: (i) => ({ startX: Math.random()*100, startY: 30 + Math.random()*40, endX: (Math.random()*40-20), endY: (Math.random()*20-10), relative: true }),
-                floating: (i) => ({ startX: Math.random()*100, startY: 20 + Math.random()*60, endX: (Math.random()*30-15), endY: (Math.random()*10-5), relative: true })
-            };
-
-            // --- 3. エンジン起動 ---
-            const logic = MovementLogics[type] || MovementLogics.rising;
-
-            for(let i=0; i<count; i++) {
-                const el = document.createElement('div');
-                el.innerText = icon;
-                el.style.position = 'absolute';
-                el.style.fontSize = (Math.random() * 20 + 40) + 'px';
-                el.style.userSelect = 'none';
-                el.style.pointerEvents = 'none';
-                
-                const meta = logic(i);
-                el.style.left = meta.startX + 'vw';
-                el.style.top = meta.startY + 'vh';
-                el.style.transition = `all ${meta.duration || '3s'} ${meta.ease || 'ease-out'}`;
-                
-                root.appendChild(el);
-
-                if (meta.type === 'scale') {
-                    el.style.transform = 'translate(-50%, -50%) scale(0)';
-                    setTimeout(() => {
-                        el.style.transform = 'translate(-50%, -50%) scale(15)';
-                        el.style.opacity = '0';
-                    }, i * 150);
-                } else if (meta.type === 'pop') {
-                    el.style.transform = 'scale(0)';
-                    setTimeout(() => {
-                        el.style.transform = 'scale(2.5)';
-                        el.style.opacity = '0';
-                    }, i * 150);
-                } else if (meta.endX !== undefined) {
-                    setTimeout(() => {
-                        const nextX = meta.relative ? (meta.startX + meta.endX) : meta.endX;
-                        const nextY = meta.relative ? (meta.startY + meta.endY) : meta.endY;
-                        el.style.left = nextX + 'vw';
-                        el.style.top = nextY + 'vh';
-                        el.style.opacity = '0';
-                    }, i * 50 + 20);
-                }
-            }
-        })();
-        </script>
-        """
-        anim_html = js_template.replace("__ICON__", icon).replace("__TYPE__", anim_type)
-        # コンテンツ更新による強制再描画
-        anim_html += f"<!-- engine_rev: {time.time()} -->"
-        components.html(anim_html, height=1)
+        # エフェクトエンジンは静的バンドル（views/frontend/celebration）で、アイコンと種類だけ渡すっぴ
+        celebration(icon, anim_type, run_id=st.session_state.get("departure_seq") or time.time())
@@ -0,0 +1,149 @@
+import streamlit as st
+import streamlit.components.v1 as components
+import pandas as pd
+import calendar
+import hashlib
+from pathlib import Path
+
+# app.py と同じ階層の static/ は、enableStaticServing で app/static/ として配信されるっぴ
+STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
+STATIC_URL = "app/static"
+
+# ビルド不要の素の HTML をそのままカスタムコンポーネントとして読み込むっぴ
+_FRONTEND_DIR = Path(__file__).resolve().parent / "frontend"
+_month_calendar = components.declare_component("month_calendar", path=str(_FRONTEND_DIR / "month_calendar"))
+_item_checklist = components.declare_component("item_checklist", path=str(_FRONTEND_DIR / "item_checklist"))
+_departure_button = components.declare_component("departure_button", path=str(_FRONTEND_DIR / "departure_button"))
+_day_watch = components.declare_component("day_watch", path=str(_FRONTEND_DIR / "day_watch"))
+_celebration = components.declare_component("celebration", path=str(_FRONTEND_DIR / "celebration"))
+_header_clock = components.declare_component("header_clock", path=str(_FRONTEND_DIR / "header_clock"))
+_style_loader = components.declare_component("style_loader", path=str(_FRONTEND_DIR / "style_loader"))
+
+def static_url(name):
+    """Content-hashed URL for a file under static/, so browsers can cache it until it changes."""
+    try:
+        mtime = (STATIC_DIR / name).stat().st_mtime_ns
+    except OSError:
+        return f"{STATIC_URL}/{name}"
+    # 更新時刻もキーに入れるので、ファイルを差し替えたら再起動しなくても新しいハッシュになるっぴ
+    return _hashed_static_url(name, mtime)
+
+@st.cache_data
+def _hashed_static_url(name, mtime):
+    digest = hashlib.sha256((STATIC_DIR / name).read_bytes()).hexdigest()[:12]
+    return f"{STATIC_URL}/{name}?v={digest}"
+
+# 出発ボタンが押された瞬間に親ページへ投げるイベント。チェックリストはこれで未送信のタップを送るっぴ
+DEPARTURE_EVENT = "glancal:departing"
+
+def month_calendar(year, month, cells=None, mode="view", selected=(), today=None, theme="admin", key=None):
+    """
+    1か月分のカレンダーを1つの要素として描くっぴ（日ごとのウィジェットを作らない）。
+
+    cells: {day(int): {"marks": "✨", "sub": "07:55"}}
+    mode: "view"（表示だけ）/ "click"（押した日を返す）/ "select"（複数選択を返す）
+    戻り値: click -> {"date": "YYYY-MM-DD", "seq": n}, select -> {"selected": [...], "seq": n}, 未操作 -> None
+    （どちらにも、押す前の描画にブラウザでかかった時間 "render_ms" が付いてくるっぴ）
+    """
+    weeks = calendar.Calendar(firstweekday=6).monthdayscalendar(year, month)
+    value = _month_calendar(
+        year=year, month=month, weeks=weeks, cells=cells or {}, mode=mode,
+        selected=sorted(selected), today=today.isoformat() if today else None,
+        theme=theme, key=key, default=None,
+    )
+    # ブラウザで測った描画時間（ms）を画面ごとに残しておくっぴ（押されたときにだけ届く）
+    if value and value.get("render_ms") is not None:
+        st.session_state.setdefault("calendar_render_ms", {})[key] = value["render_ms"]
+    return value
+
+def calendar_render_ms(key):
+    """いちばん最近届いた、ブラウザでのカレンダー描画時間（ms）。まだ一度も押されていなければ None。"""
+    return st.session_state.get("calendar_render_ms", {}).get(key)
+
+def item_checklist(items, checked, key=None):
+    """
+    朝の持ち物チェック。タップはブラウザの中だけで切り替わり、落ち着いたらまとめて返ってくるっぴ。
+
+    items: [{"id": 1, "name": "ハンカチ"}, ...]
+    出発ボタンが押されたら（DEPARTURE_EVENT）、待たずにチェック状態を送るっぴ。
+    戻り値: {"checked": [item_id, ...], "seq": n}（まだ何も送られていなければ None）
+    """
+    return _item_checklist(
+        items=[{"id": item["id"], "name": item["name"]} for item in items],
+        checked=sorted(checked), on_img=static_url("check_on.png"), off_img=static_url("check_off.png"),
+        flush_event=DEPARTURE_EVENT, key=key, default=None,
+    )
+
+def departure_button(window, key=None):
+    """
+    出発ボタン。押せる時間かどうかとカウントダウンはブラウザだけで進めるので、待っている間はサーバーに何も来ないっぴ。
+
+    window: LogicManager.get_departure_window() の戻り値（制限なしなら opens_in/closes_in が None）
+    戻り値: 押されたら {"seq": n}、まだなら None。押せるかどうかの最終判断はサーバー側でするっぴ。
+    """
+    return _departure_button(
+        opens_in=window["opens_in"], closes_in=window["closes_in"],
+        start=window["start_time"].strftime("%H:%M"), end=window["end_time"].strftime("%H:%M"),
+        flush_event=DEPARTURE_EVENT, key=key, default=None,
+    )
+
+def day_watch(day_epoch, jitter=30, key=None):
+    """
+    日付が変わる時刻に一度だけ再実行を起こす、見えない部品だっぴ。
+
+    day_epoch: LogicManager.day_epoch。残り秒数はサーバーの時計で数えて渡すっぴ。
+    jitter: 全部の端末が同じ瞬間に来ないよう、最大この秒数だけずらす
+    """
+    return _day_watch(epoch=day_epoch.current(), seconds=day_epoch.seconds_until_rollover(),
+                      jitter=jitter, key=key, default=None)
+
+def celebration(icon, anim_type, run_id, count=35, key=None):
+    """
+    出発のお祝いエフェクト。エンジンは静的ファイルなのでブラウザにキャッシュされ、送るのはパラメータだけだっぴ。
+
+    run_id: 出発ごとに変わる値。同じ run_id では二度飛ばない
+    count: 基本の粒の数（遅い端末ではブラウザ側で減らす）
+    """
+    return _celebration(icon=icon, type=anim_type, run_id=run_id, count=count, key=key, default=None)
+
+def header_clock(key="header_clock"):
+    """
+    ヘッダーの時計。キーも引数も毎回同じなので、再実行しても iframe は作り直されないっぴ。
+    時刻はブラウザの中だけで進む。
+    """
+    return _header_clock(key=key, default=None)
+
+def style_loader(href, images, key="style_loader"):
+    """
+    共通スタイルを親ページに入れる見えない部品。毎回同じキーで置くので iframe は作り直されず、
+    読み込みに失敗しても入るまでやり直すっぴ。
+
+    href: static_url("style.css")
+    images: {CSS 変数名: static_url(画像)}
+    値は返さない（入ったかどうかはブラウザの中だけで確かめる）っぴ。
+    """
+    _style_loader(href=href, images=images, key=key, default=None)
+
+def item_list_editor(item_names, key):
+    """
+    持ち物の一覧を1つの表で編集するっぴ（何個でも追加でき、「順」の数字で並べ替え）。
+    フォームの中に置けば、送信するまで再実行されないっぴ。
+
+    戻り値: 空行を除いた持ち物名のリスト（順の小さい順、同じなら表の並び順）
+    """
+    frame = pd.DataFrame({
+        "順": pd.Series(range(1, len(item_names) + 1), dtype="Int64"),
+        "持ち物": pd.Series(list(item_names), dtype="object"),
+    })
+    edited = st.data_editor(
+        frame, key=key, num_rows="dynamic", hide_index=True, use_container_width=True,
+        column_config={
+            "順": st.column_config.NumberColumn("順", min_value=1, step=1, width="small"),
+            "持ち物": st.column_config.TextColumn("持ち物", width="large"),
+        },
+    )
+    rows = []
+    for pos, (order, name) in enumerate(zip(edited["順"], edited["持ち物"])):
+        if isinstance(name, str) and name.strip():
+            rows.append((order if pd.notna(order) else float("inf"), pos, name.strip()))
+    return [name for _, _, name in sorted(rows)]
@@ -1,24 +1,11 @@
 import streamlit as st
-import streamlit.components.v1 as components
 import calendar
-import os
 import random
-import base64
 import time
 import textwrap
-from datetime import datetime
+from views.utils import inject_common_css, render_header
 from PIL import Image
 
-# --- Cache-able Functions (Global to take advantage of st.cache) ---
-@st.cache_data
-def get_img_base64_cached(path):
-    """Caches the heavy disk I/O and base64 encoding."""
-    if os.path.exists(path):
-        with open(path, "rb") as f:
-            data = f.read()
-        return base64.b64encode(data).decode()
-    return ""
-
 class MainView:
     def __init__(self, logic_manager):
         self.logic_manager = logic_manager
@@ -42,73 +29,8 @@ class MainView:
         return st.empty()
 
     def _render_header(self):
-        st.markdown('<h2 class="app-title">✨ Glancal Journey ✨</h2>', unsafe_allow_html=True)
-        
-        # Independent Clock Component
-        clock_html = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {
-                    background-color: transparent;
-                    color: white;
-                    font-family: 'Helvetica', 'Arial', sans-serif;
-                    text-align: center;
-                    margin: 0;
-                    padding: 0;
-                    overflow: hidden;
-                    display: flex;
-                    flex-direction: column;
-                    justify-content: center;
-                    height: 100vh;
-                }
-                .date-text {
-                    font-size: 1.5rem;
-                    font-weight: bold;
-                    margin-bottom: 5px;
-                    letter-spacing: 1px;
-                }
-                .time-text {
-                    font-size: 4.5rem;
-                    font-weight: 900;
-                    line-height: 1;
-                    letter-spacing: 2px;
-                    margin-top: 5px;
-                }
-            </style>
-        </head>
-        <body>
-            <div id="clock_app">
-                <div class="date-text"></div>
-                <div class="time-text"></div>
-            </div>
-            <script>
-                function updateClock() {
-                    var now = new Date();
-                    var y = now.getFullYear();
-                    var m = ("0" + (now.getMonth() + 1)).slice(-2);
-                    var d = ("0" + now.getDate()).slice(-2);
-                    var dateStr = `${y}年${m}月${d}日`;
-                    
-                    var h = ("0" + now.getHours()).slice(-2);
-                    var min = ("0" + now.getMinutes()).slice(-2);
-                    var s = ("0" + now.getSeconds()).slice(-2);
-                    var timeStr = `${h}:${min}:${s}`;
-                    
-                    var app = document.getElementById("clock_app");
-                    if (app) {
-                        app.querySelector(".date-text").innerText = dateStr;
-                        app.querySelector(".time-text").innerText = timeStr;
-                    }
-                }
-                setInterval(updateClock, 1000);
-                updateClock();
-            </script>
-        </body>
-        </html>
-        """
-        components.html(clock_html, height=150)
+        # 共通ヘッダー（時計は固定キーのコンポーネントなので再実行で作り直されない）
+        render_header()
 
     def _render_child_screen(self):
         mode_info = self.logic_manager.get_current_mode()
@@ -171,7 +93,7 @@ class MainView:
         warning_msg = ""
 
         if time_rules["is_restricted"]:
-            now_t = datetime.now().time()
+            now_t = self.logic_manager.clock.now().time()
             if not (time_rules["start_time"] <= now_t <= time_rules["end_time"]):
                 is_disabled = True
                 warning_msg = f"今は魔法が使えない時間だよ。<br>{time_rules['start_time'].strftime('%H:%M')}になったら押せるよ！"
@@ -225,8 +147,8 @@ class MainView:
             st.session_state.page = "main"
             st.rerun()
 
-        year = datetime.now().year
-        month = datetime.now().month
+        year = self.logic_manager.clock.now().year
+        month = self.logic_manager.clock.now().month
         
         # --- Optimization: GET DATA ONCE OUTSIDE THE LOOP ---
         history = self.logic_manager.get_monthly_history(year, month)
@@ -291,82 +213,5 @@ class MainView:
             st.toast("🌟 スター級の出発だね！", icon="🤩")
 
     def _inject_custom_css(self):
-        # Optimization: Use Cached Image Encoding
-        b64_on = get_img_base64_cached("image/check_on.png")
-        b64_off = get_img_base64_cached("image/check_off.png")
-
-        st.markdown(f"""
-        <style>
-        .stApp {{ background-color: #87CEEB; font-family: 'Helvetica', sans-serif; }}
-        .app-title {{ text-align: center; color: white; font-weight: bold; text-shadow: 2px 2px 4px rgba(0,0,0,0.2); }}
-        .date-display {{ text-align: center; color: white; margin-bottom: 20px; font-weight: bold; }}
-        .message-card {{ padding: 30px; border-radius: 20px; text-align: center; margin-top: 20px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); }}
-        
-        /* Hide Marker */
-        .item-btn-marker {{ display: none; }}
-
-        /* Global Button Styles */
-        div[data-testid="stButton"] button {{
-            min-height: 80px; 
-            border-radius: 20px; 
-            font-size: 1.5rem !important;
-            font-weight: bold !important;
-            border: 3px solid white !important;
-            box-shadow: 0 4px 0 rgba(0,0,0,0.1);
-            transition: all 0.1s;
-        }}
-        
-        div[data-testid="stButton"] button:active {{
-            box-shadow: 0 0 0 rgba(0,0,0,0.1);
-            transform: translateY(4px);
-        }}
-
-        /* Targeting Strategy: :has() */
-        div:has(.item-btn-marker) + div button {{
-            padding-left: 70px !important; 
-            position: relative;
-            display: flex;
-            align-items: center;
-            justify-content: flex-start;
-        }}
-
-        div:has(.item-btn-marker) + div button::before {{
-            content: "";
-            position: absolute;
-            left: 15px;
-            top: 50%;
-            transform: translateY(-50%);
-            width: 45px;
-            height: 45px;
-            background-repeat: no-repeat;
-            background-position: center;
-            background-size: contain;
-        }}
-
-        div:has(.item-btn-marker) + div button[kind="primary"] {{
-            background-color: #98FB98 !important; 
-            color: #006400 !important;
-            border-color: #006400 !important;
-        }}
-        div:has(.item-btn-marker) + div button[kind="primary"]::before {{
-            background-image: url('data:image/png;base64,{b64_on}');
-        }}
-
-        div:has(.item-btn-marker) + div button[kind="secondary"] {{
-            background-color: #FFFACD !important;
-            color: #555 !important;
-        }}
-        div:has(.item-btn-marker) + div button[kind="secondary"]::before {{
-            background-image: url('data:image/png;base64,{b64_off}');
-        }}
-
-        button[key="btn_main_go"] {{
-            background-color: #FFEB3B !important;
-            height: 120px !important;
-            font-size: 2.5rem !important;
-            border-radius: 60px !important;
-            justify-content: center !important; 
-            padding-left: 20px !important; 
-        }}
-        </style>
-        """, unsafe_allow_html=True)
\ No newline at end of file
+        # 共通スタイルシートに一本化（固定キーの部品が入るまで面倒を見る）
+        inject_common_css()
\ No newline at end of file